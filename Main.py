@@ -2,33 +2,89 @@ import json
 import os
 import sys
 import time
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
 import cloudscraper
 import random
 import pandas as pd
 from collections import defaultdict
+from aggregate import MovieAggregator
+from fetcher import DEFAULT_CONCURRENCY, fetch_all
+from snapshot import dated_path
+from show_store import append_shows, clear_date, merge_parts
+from response_cache import ResponseCache
+from records import Show, encode_show, intern_movie, intern_text, intern_venue, shows_from_json
+from venue_schedule import VenueSchedule
 
 # ---------------- CONFIG ----------------
 # Default hardcoded date
 DATE_CODE = 20251002
 
-# Override with command line argument if provided
-if len(sys.argv) > 1:
-    DATE_CODE = int(sys.argv[1])
 
-print(f"📅 Fetching box office for date: {DATE_CODE}")
-
-NUM_WORKERS = 5
-MAX_ERRORS = 10
+def parse_dates(args):
+    """Dates to sweep, given as 20251002 20251003, 20251002,20251003 or an
+    inclusive range 20251002-20251005."""
+    dates = []
+    for arg in args:
+        for part in filter(None, arg.split(",")):
+            start, _, end = part.partition("-")
+            day = datetime.strptime(start, "%Y%m%d")
+            last = datetime.strptime(end or start, "%Y%m%d")
+            while day <= last:
+                code = int(day.strftime("%Y%m%d"))
+                if code not in dates:
+                    dates.append(code)
+                day += timedelta(days=1)
+    return dates
+
+
+# Override with command line arguments if provided. All dates are swept in
+# one run; the first is the primary date (un-suffixed files, live feed).
+# --reparse rebuilds every output of the dates from RESPONSE_CACHE_DIR
+# without fetching anything (e.g. after a parsing change)
+REPARSE = "--reparse" in sys.argv[1:]
+DATE_CODES = parse_dates(a for a in sys.argv[1:] if not a.startswith("--")) or [DATE_CODE]
+DATE_CODE = DATE_CODES[0]
+
+print(f"📅 Fetching box office for date: {', '.join(map(str, DATE_CODES))}")
+
+# Showtimes-by-venue endpoint (override to point at a test server)
+API_URL = os.environ.get(
+    "BMS_API_URL", "https://in.bookmyshow.com/api/v2/mobile/showtimes/byvenue"
+)
+# Most requests in flight at once, all over one pooled HTTP client; the
+# actual level adapts to upstream throttling below this ceiling
+CONCURRENCY = int(os.environ.get("BMS_CONCURRENCY", DEFAULT_CONCURRENCY))
+# Venues that still failed after every retry, written at the end of a run
+FAILED_VENUES_FILE = "failed_venues.json"
+# Dates of this run, for scraper_runner to publish
+SWEEP_DATES_FILE = "sweep_dates.json"
+# Refresh tier + last shows of every venue; venues whose tier isn't due
+# yet are carried forward from here instead of fetched (kept across runs)
+SCHEDULE_FILE = "venue_schedule.json"
+SCHEDULE_SHOWS_DB = "venue_shows.sqlite"
+# Latest raw response of every venue/date, gzip-compressed (kept across runs)
+RESPONSE_CACHE_DIR = "response_cache"
+response_cache = ResponseCache(RESPONSE_CACHE_DIR)
 
 IST = timezone(timedelta(hours=5, minutes=30))
 now = datetime.now(IST)
 
 scraper = cloudscraper.create_scraper()
-lock = threading.Lock()
-error_count = 0
+
+# Per-venue updates for the API's live stream (reset by scraper_runner each run)
+LIVE_FEED_FILE = "live_updates.jsonl"
+live_seq = 0
+
+# Fetched venues are appended here; summary files are only rewritten
+# (compacted) every COMPACT_EVERY venues / COMPACT_INTERVAL seconds
+JOURNAL_FILE = "venue_journal.jsonl"
+COMPACT_EVERY = 50
+COMPACT_INTERVAL = 30  # seconds
+journal = None
+venues_since_compact = 0
+last_compact = time.time()
 
 # Example User-Agent pool
 USER_AGENTS = [
@@ -87,46 +143,89 @@ def format_rgross(value):
     else:
         return str(round(value, 2))
 
+
+def state_file(name, date_code):
+    """Progress files of the primary date keep their names; other dates
+    get a suffix (movie_summary.json -> movie_summary_20251003.json)."""
+    return name if date_code == DATE_CODE else dated_path(name, date_code)
+
+
 ALL_VENUES = load_all_venues()
 # ---------------- FETCH DATA ----------------
-ALL_SHOWS = []
-
-# Load saved ALL_SHOWS if present  # NEW
-if os.path.exists("all_shows.json"):
-    with open("all_shows.json", "r", encoding="utf-8") as f:
-        try:
-            ALL_SHOWS = json.load(f)
-            print(f"📂 Loaded {len(ALL_SHOWS)} saved shows from all_shows.json")
-        except:
-            ALL_SHOWS = []
+# Event groups whose show-level records are kept, comma separated, or
+# "all" for every event: BMS_TRACKED_EVENTS=EG00376057,EG00412345
+# (default: They Call Him OG - EG00376057)
+TRACKED_EVENTS = os.environ.get("BMS_TRACKED_EVENTS", "EG00376057")
+TRACKED_EVENTS = (
+    None
+    if TRACKED_EVENTS.strip().lower() == "all"
+    else {e.strip() for e in TRACKED_EVENTS.split(",") if e.strip()}
+)
+# Parquet dataset partitioned by date and event (shows/date=<d>/event=<e>/),
+# one file appended per compaction (reset by scraper_runner each run)
+SHOWS_DIR = "shows"
+ALL_SHOWS = {}  # date -> {event: show records not written yet}
+SHOWS_SAVED = defaultdict(int)  # date -> show records written
+
+
+def is_tracked(event_code):
+    return TRACKED_EVENTS is None or event_code in TRACKED_EVENTS
+
+
+def track_shows(date_code, shows_by_movie):
+    """Queue the show records of tracked events for the next compaction."""
+    pending = ALL_SHOWS.setdefault(date_code, {})
+    for shows in shows_by_movie.values():
+        for show in shows:
+            if is_tracked(show.parent_event_code):
+                pending.setdefault(show.parent_event_code, []).append(show)
+
+
+def write_shows(date_code):
+    """Append the queued show records of one date to their event datasets."""
+    for event_code, shows in ALL_SHOWS.get(date_code, {}).items():
+        append_shows(SHOWS_DIR, date_code, event_code, shows)
+        SHOWS_SAVED[date_code] += len(shows)
+    ALL_SHOWS[date_code] = {}
 
 
 # ---------------- FETCH DATA ----------------
-def fetch_data(venue_code):
-    url = f"https://in.bookmyshow.com/api/v2/mobile/showtimes/byvenue?venueCode={venue_code}&dateCode={DATE_CODE}"
+def get_clearance_cookies():
+    """Do the Cloudflare handshake once with cloudscraper; the async pool
+    reuses its cookies (with the same headers) for every request."""
+    origin = "{0.scheme}://{0.netloc}/".format(urlsplit(API_URL))
     try:
-        res = scraper.get(url, headers=headers)
-        res.raise_for_status()
-        data = res.json()
+        scraper.get(origin, headers=headers, timeout=20)
     except Exception as e:
-        print(f"⚠️ Failed {venue_code}: {e}")
-        return None
+        print(f"⚠️ Handshake failed, continuing without cookies: {e}")
+    return scraper.cookies.get_dict()
 
+
+def parse_showtimes(venue_code, date_code, data):
+    """Turn one showtimes-by-venue payload into {movie key: [show records]},
+    keyed by MovieInfo.key (parent/child event code, dimension, language)."""
     show_details = data.get("ShowDetails", [])
     if not show_details:
         return {}
 
     api_date = show_details[0].get("Date")
-    if str(api_date) != str(DATE_CODE):
-        print(f"⏩ Skipping summary for {venue_code} (date mismatch: {api_date} vs {DATE_CODE})")
+    if str(api_date) != str(date_code):
+        print(f"⏩ Skipping summary for {venue_code} (date mismatch: {api_date} vs {date_code})")
         return {}
 
     venue_info = show_details[0].get("Venues", {})
     if not venue_info:
         return {}
 
-    venue_name = venue_info.get("VenueName", "")
-    venue_add = venue_info.get("VenueAdd", "")
+    venue_meta = ALL_VENUES.get(venue_code, {})
+    venue = intern_venue(
+        venue_code,
+        venue_info.get("VenueName", ""),
+        venue_info.get("VenueAdd", ""),
+        venue_meta.get("City", "Unknown"),
+        venue_meta.get("State", "Unknown"),
+        venue_meta.get("VenueCompName", "Unknown"),
+    )
     shows_by_movie = defaultdict(list)
 
     for event in data.get("ShowDetails", [{}])[0].get("Event", []):
@@ -138,13 +237,9 @@ def fetch_data(venue_code):
             language = child.get("EventLanguage", "").strip()
             child_event_code = child.get("EventCode")
 
-            parts = []
-            if dimension:
-                parts.append(dimension)
-            if language:
-                parts.append(language)
-            extra_info = " | ".join(parts)
-            movie_title = f"{parent_title} [{extra_info}]" if extra_info else parent_title
+            movie = intern_movie(
+                parent_title, parent_event_code, child_event_code, dimension, language
+            )
 
             for show in child.get("ShowTimes", []):
                 total = sold = available = gross = 0
@@ -157,340 +252,313 @@ def fetch_data(venue_code):
                     sold += seats - avail
                     gross += (seats - avail) * price
 
-                show_record = {
-                    "venue_code": venue_code,
-                    "venue": venue_name,
-                    "address": venue_add,
-                    "city": ALL_VENUES.get(venue_code, {}).get("City", "Unknown"),
-                    "state": ALL_VENUES.get(venue_code, {}).get("State", "Unknown"),
-                    "chain": ALL_VENUES.get(venue_code, {}).get("VenueCompName", "Unknown"),
-                    "movie": movie_title,
-                    "parent_event_code": parent_event_code,
-                    "child_event_code": child_event_code,
-                    "dimension": dimension,
-                    "language": language,
-                    "time": show.get("ShowTime"),
-                    "session_id": show.get("SessionId"),
-                    "audi": show.get("Attributes", ""),
-                    "total": total,
-                    "sold": sold,
-                    "available": available,
-                    "occupancy": round((sold / total * 100), 2) if total else 0,
-                    "gross": gross,
-                }
-
-                shows_by_movie[movie_title].append(show_record)
-
-                # Append to global ALL_SHOWS  # NEW 
-                if parent_event_code == "EG00376057":  # They Call Him OG - EG00376057
-                    ALL_SHOWS.append(show_record)
-
-    return shows_by_movie
+                # Venue/movie attributes are shared objects, see records.py
+                show_record = Show(
+                    venue,
+                    movie,
+                    time=intern_text(show.get("ShowTime")),
+                    session_id=show.get("SessionId"),
+                    audi=intern_text(show.get("Attributes", "")),
+                    total=total,
+                    sold=sold,
+                    available=available,
+                    occupancy=round((sold / total * 100), 2) if total else 0,
+                    gross=gross,
+                )
 
+                shows_by_movie[movie.key].append(show_record)
 
-# ---------------- SUMMARY ----------------
-def compile_summary(all_data, venues_info):
-    movie_stats = {}
-
-    for venue_code, movies in all_data.items():
-        venue_meta = venues_info.get(venue_code, {})
-        city = venue_meta.get("City", "Unknown")
-        state = venue_meta.get("State", "Unknown")
-
-        for movie, shows in movies.items():
-            if movie not in movie_stats:
-                movie_stats[movie] = {
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "totalSeats": 0,
-                    "venues": 0,
-                    "details": [],  # <-- array instead of dict
-                }
-
-            # search for existing city/state bucket
-            city_obj = next(
-                (
-                    c
-                    for c in movie_stats[movie]["details"]
-                    if c["city"] == city and c["state"] == state
-                ),
-                None,
-            )
-
-            if not city_obj:
-                city_obj = {
-                    "city": city,
-                    "state": state,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                }
-                movie_stats[movie]["details"].append(city_obj)
-
-            # add venue count once per venue
-            movie_stats[movie]["venues"] += 1
-
-            for show in shows:
-                occ = show["occupancy"]
-
-                # overall
-                movie_stats[movie]["shows"] += 1
-                movie_stats[movie]["gross"] += show["gross"]
-                movie_stats[movie]["sold"] += show["sold"]
-                movie_stats[movie]["totalSeats"] += show["total"]
-
-                if occ >= 98:
-                    movie_stats[movie]["housefull"] += 1
-                elif occ >= 50:
-                    movie_stats[movie]["fastfilling"] += 1
-
-                # city-level
-                city_obj["shows"] += 1
-                city_obj["gross"] += show["gross"]
-                city_obj["sold"] += show["sold"]
-                city_obj["totalSeats"] += show["total"]
-
-                if occ >= 98:
-                    city_obj["housefull"] += 1
-                elif occ >= 50:
-                    city_obj["fastfilling"] += 1
-
-    return movie_stats
+    return shows_by_movie
 
 
 # ---------------- PROGRESS ----------------
-def dump_progress(all_data, fetched_venues):
-    # Load existing summary if present
-    if os.path.exists("movie_summary.json"):
-        with open("movie_summary.json", "r", encoding="utf-8") as f:
+def load_aggregator(date_code):
+    """Resume the running summary of one date from the last compaction, if any."""
+    movie_summary = {}
+    summary_path = state_file("movie_summary.json", date_code)
+    if os.path.exists(summary_path):
+        with open(summary_path, "r", encoding="utf-8") as f:
             try:
                 movie_summary = json.load(f)
             except:
                 movie_summary = {}
-    else:
-        movie_summary = {}
-
-    # Load venues info for city/state mapping
-    if os.path.exists("venues.json"):
-        with open("venues.json", "r", encoding="utf-8") as f:
-            venues_info = json.load(f)
-    else:
-        venues_info = {}
 
-    # Load already processed venues
-    if os.path.exists("processed_venues.json"):
-        with open("processed_venues.json", "r", encoding="utf-8") as f:
+    processed_venues = set()
+    processed_path = state_file("processed_venues.json", date_code)
+    if os.path.exists(processed_path):
+        with open(processed_path, "r", encoding="utf-8") as f:
             try:
                 processed_venues = set(json.load(f))
             except:
                 processed_venues = set()
+
+    return MovieAggregator(ALL_VENUES, movie_summary, processed_venues)
+
+
+def load_run(date_code):
+    """Everything one date of the sweep keeps between venues."""
+    if REPARSE:
+        # Rebuilt from scratch, nothing is resumed
+        clear_date(SHOWS_DIR, date_code)
+        return {"aggregator": MovieAggregator(ALL_VENUES), "fetched": set()}
+
+    fetched_path = state_file("fetchedvenues.json", date_code)
+    if os.path.exists(fetched_path):
+        with open(fetched_path, "r", encoding="utf-8") as f:
+            fetched_venues = set(json.load(f))
     else:
-        processed_venues = set()
-
-    # --- Process only NEW venues ---
-    new_venues = set(fetched_venues) - processed_venues
-
-    for vcode in new_venues:
-        venue_meta = venues_info.get(vcode, {})
-        city = venue_meta.get("City", "Unknown")
-        state = venue_meta.get("State", "Unknown")
-
-        for movie, shows in all_data.get(vcode, {}).items():
-            if movie not in movie_summary:
-                movie_summary[movie] = {
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "venues": 0,
-                    "cities": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
-                    "details": [],
-                    "Chain_details": [],
-                }
-
-            # --- Update top-level movie stats ---
-            movie_summary[movie]["venues"] += 1
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
-
-                movie_summary[movie]["shows"] += 1
-                movie_summary[movie]["gross"] += show["gross"]
-                movie_summary[movie]["sold"] += sold
-                movie_summary[movie]["totalSeats"] += total
-
-                if 50 <= occ < 98:
-                    movie_summary[movie]["fastfilling"] += 1
-                elif occ >= 98:
-                    movie_summary[movie]["housefull"] += 1
-
-            # --- Update city/state level ---
-            city_block = None
-            for d in movie_summary[movie]["details"]:
-                if d["city"] == city and d["state"] == state:
-                    city_block = d
-                    break
-
-            if city_block is None:
-                city_block = {
-                    "city": city,
-                    "state": state,
-                    "venues": 0,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
-                }
-                movie_summary[movie]["details"].append(city_block)
-                movie_summary[movie]["cities"] += 1  # new city found
-
-            city_block["venues"] += 1
-
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
-
-                city_block["shows"] += 1
-                city_block["gross"] += show["gross"]
-                city_block["sold"] += sold
-                city_block["totalSeats"] += total
-
-                if 50 <= occ < 98:
-                    city_block["fastfilling"] += 1
-                elif occ >= 98:
-                    city_block["housefull"] += 1
-
-            if city_block["totalSeats"] > 0:
-                city_block["occupancy"] = round(
-                    city_block["sold"] / city_block["totalSeats"] * 100, 2
-                )
+        fetched_venues = set()
 
-            # --- Update chain-level ---
-            chain = shows[0].get("chain", "Unknown")
-            chain_block = None
-            for d in movie_summary[movie]["Chain_details"]:
-                if d["chain"] == chain:
-                    chain_block = d
-                    break
-
-            if chain_block is None:
-                chain_block = {
-                    "chain": chain,
-                    "venues": 0,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
-                }
-                movie_summary[movie]["Chain_details"].append(chain_block)
-
-            chain_block["venues"] += 1
-
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
-
-                chain_block["shows"] += 1
-                chain_block["gross"] += show["gross"]
-                chain_block["sold"] += sold
-                chain_block["totalSeats"] += total
-
-                if 50 <= occ < 98:
-                    chain_block["fastfilling"] += 1
-                elif occ >= 98:
-                    chain_block["housefull"] += 1
-
-            if chain_block["totalSeats"] > 0:
-                chain_block["occupancy"] = round(
-                    chain_block["sold"] / chain_block["totalSeats"] * 100, 2
-                )
+    return {
+        "aggregator": load_aggregator(date_code),
+        "fetched": fetched_venues,
+    }
 
-    # --- Update movie-level occupancy after processing ---
-    for movie, data in movie_summary.items():
-        if data["totalSeats"] > 0:
-            data["occupancy"] = round(data["sold"] / data["totalSeats"] * 100, 2)
-        else:
-            data["occupancy"] = 0.0
 
-        if "details" in data:
-            data["details"] = sorted(
-                data["details"], key=lambda x: x["gross"], reverse=True
-            )
+def discard_stale_progress():
+    """Progress files of a run that didn't finish are resumed, but the
+    primary date's have no date suffix: drop them if that run swept
+    another primary date."""
+    if not os.path.exists(SWEEP_DATES_FILE):
+        return
+    try:
+        with open(SWEEP_DATES_FILE, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    if previous and previous[0] == DATE_CODE:
+        return
+    for name in ("movie_summary.json", "fetchedvenues.json", "processed_venues.json"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def dump_progress(date_code, aggregator, fetched_venues):
+    """Write the in-memory state of one date to its summary files."""
+    summary_path = state_file("movie_summary.json", date_code)
+    fetched_path = state_file("fetchedvenues.json", date_code)
+    processed_path = state_file("processed_venues.json", date_code)
 
     # --- Save updated movie summary ---
-    with open("movie_summary.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(movie_summary, f, indent=2, ensure_ascii=False)
-    os.replace("movie_summary.json.tmp", "movie_summary.json")
+    with open(summary_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(aggregator.snapshot(), f, indent=2, ensure_ascii=False)
+    os.replace(summary_path + ".tmp", summary_path)
 
     # --- Save fetched venues ---
-    with open("fetchedvenues.json.tmp", "w", encoding="utf-8") as f:
+    with open(fetched_path + ".tmp", "w", encoding="utf-8") as f:
         json.dump(list(fetched_venues), f, indent=2)
-    os.replace("fetchedvenues.json.tmp", "fetchedvenues.json")
+    os.replace(fetched_path + ".tmp", fetched_path)
 
     # --- Save processed venues ---
-    processed_venues |= new_venues
-    with open("processed_venues.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(list(processed_venues), f, indent=2)
-    os.replace("processed_venues.json.tmp", "processed_venues.json")
+    with open(processed_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(list(aggregator.processed), f, indent=2)
+    os.replace(processed_path + ".tmp", processed_path)
 
-    # --- Save ALL_SHOWS snapshot (new) ---
-    with open("all_shows.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(ALL_SHOWS, f, indent=2, ensure_ascii=False)
-    os.replace("all_shows.json.tmp", "all_shows.json")
+    # --- Append tracked shows ---
+    write_shows(date_code)
 
     print(
-        f"💾 Progress dumped. Venues: {len(fetched_venues)} "
-        f"(New added: {len(new_venues)}), Shows saved: {len(ALL_SHOWS)}"
+        f"💾 Progress dumped ({date_code}). Venues: {len(fetched_venues)}, Shows saved: {SHOWS_SAVED[date_code]}"
+    )
+
+
+# ---------------- LIVE FEED ----------------
+def append_live_update(venue_codes, aggregator, touched):
+    """Append one line with the current numbers of every movie touched by
+    `venue_codes` to LIVE_FEED_FILE; the API tails it and pushes it to clients.
+    Only the primary date is streamed."""
+    global live_seq
+    live_seq += 1
+    names = aggregator.names(touched)
+    movies = {}
+    for movie, (city_keys, chain_keys) in touched.items():
+        movies[names[movie]] = aggregator.entry(movie, city_keys, chain_keys)
+
+    record = {
+        "seq": live_seq,
+        "ts": datetime.now(IST).isoformat(),
+        "date": DATE_CODE,
+        "venues": sorted(venue_codes),
+        "movies": movies,
+    }
+    with open(LIVE_FEED_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# ---------------- JOURNAL ----------------
+def append_journal(venue_code, date_code, shows_by_movie):
+    """Append one fetched venue/date (and its schedule entry) to the journal."""
+    global journal, venues_since_compact
+    if journal is None:
+        journal = open(JOURNAL_FILE, "a", encoding="utf-8")
+    shows = [show for movie_shows in shows_by_movie.values() for show in movie_shows]
+    record = {
+        "venue": venue_code,
+        "date": date_code,
+        "shows": shows,
+        "schedule": schedule.entry(date_code, venue_code),
+    }
+    journal.write(json.dumps(record, ensure_ascii=False, default=encode_show) + "\n")
+    journal.flush()
+    venues_since_compact += 1
+
+
+def replay_journal(runs):
+    """Restore venues fetched after the last compaction (crash / restart)."""
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+
+    replayed = 0
+    with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash mid-write
+            try:
+                date_code = int(record.get("date"))
+            except (TypeError, ValueError):
+                continue
+            if date_code not in runs:
+                continue
+
+            run = runs[date_code]
+            venue_code = record["venue"]
+            movies = shows_from_json(record["shows"])
+            if venue_code not in run["fetched"]:
+                retract_carried(date_code, venue_code)
+                # The schedule is committed at compaction: put this fetch back
+                if record.get("schedule"):
+                    schedule.restore(date_code, venue_code, movies, record["schedule"])
+            run["fetched"].add(venue_code)
+            # Already-compacted venues are skipped, and so are their shows,
+            # since the show datasets have them up to the last compaction
+            if run["aggregator"].add_venue(venue_code, movies) is not None:
+                track_shows(date_code, movies)
+            replayed += 1
+    return replayed
+
+
+def compact_journal(runs):
+    """Write the summary files of every date and commit the schedule, then
+    empty the journal."""
+    global venues_since_compact, last_compact
+    for date_code, run in runs.items():
+        dump_progress(date_code, run["aggregator"], run["fetched"])
+    # After the fetched lists: a crash in between replays no venue whose
+    # carried shows the schedule has already replaced
+    schedule.save()
+    if journal is not None:
+        journal.seek(0)
+        journal.truncate()
+    elif os.path.exists(JOURNAL_FILE):
+        open(JOURNAL_FILE, "w").close()
+    venues_since_compact = 0
+    last_compact = time.time()
+
+
+def compaction_due():
+    return (
+        venues_since_compact >= COMPACT_EVERY
+        or time.time() - last_compact >= COMPACT_INTERVAL
     )
 
 
 # ---------------- FETCH SAFE ----------------
-def fetch_venue_safe(venue_code):
-    global error_count
-    with lock:
-        if venue_code in fetched_venues:
-            return
-
-    data = fetch_data(venue_code)
-    if data is None:  # real error
-        with lock:
-            error_count += 1
-            if error_count >= MAX_ERRORS:
-                print("🛑 Too many errors. Restarting...")
-                dump_progress(all_data, fetched_venues)
-                time.sleep(0.5)
-                os.execv(sys.executable, ["python"] + sys.argv)
+def handle_venue(venue_code, date_code, payload, body=None):
+    """Called on the event loop once per venue/date with its parsed and raw
+    response, or None if every retry failed (those are listed in
+    FAILED_VENUES_FILE)."""
+    run = runs[date_code]
+    fetched_venues, aggregator = run["fetched"], run["aggregator"]
+    if venue_code in fetched_venues or payload is None:
+        return
+
+    response_hash = None
+    if body is not None:
+        response_hash = response_cache.put(date_code, venue_code, body)
+    data = None
+    if (
+        not REPARSE
+        and response_hash is not None
+        and response_hash == schedule.response_hash(date_code, venue_code)
+    ):
+        # Same bytes as last time: reuse the shows parsed from them
+        data = schedule.last_shows(date_code, venue_code)
+    touched = {}
+    if data is None:
+        data = parse_showtimes(venue_code, date_code, payload)
+        # Counted with its last shows so far: swap those for the fresh ones
+        retract_carried(date_code, venue_code, touched)
+    # Folded into the aggregates below; only tracked events keep their shows
+    fetched_venues.add(venue_code)
+    track_shows(date_code, data)
+    if REPARSE:
+        # Same response as when it was fetched: keep that fetch's time
+        schedule.replace_shows(date_code, venue_code, data)
     else:
-        with lock:
-            if venue_code not in all_data:
-                all_data[venue_code] = {}
-            # Only add to summary if non-empty
-            if data:
-                for movie, shows in data.items():
-                    all_data[venue_code][movie] = shows
-            fetched_venues.add(venue_code)
-            print(
-                f"✅ Successfully fetched venue: {venue_code} ({len(fetched_venues)} fetched so far)"
-            )
-            dump_progress(all_data, fetched_venues)
+        schedule.record(date_code, venue_code, data, response_hash=response_hash)
+    append_journal(venue_code, date_code, data)
+    aggregator.add_venue(venue_code, data, touched)
+    if touched and date_code == DATE_CODE:
+        append_live_update([venue_code], aggregator, touched)
+    print(
+        f"✅ Successfully fetched venue: {venue_code} for {date_code} ({len(fetched_venues)} fetched so far)"
+    )
+    if compaction_due():
+        compact_journal(runs)
+
+
+def carry_forward(date_code, venue_code, shows_by_movie, due=False):
+    """Count a venue with its last-known shows. One that isn't due keeps
+    them; a due one is still fetched, and its fresh shows then replace
+    them (see retract_carried), so a failed fetch leaves the last numbers."""
+    run = runs[date_code]
+    if not due:
+        run["fetched"].add(venue_code)
+    if run["aggregator"].add_venue(venue_code, shows_by_movie) is not None and not due:
+        track_shows(date_code, shows_by_movie)
+
+
+def keep_carried(date_code, venue_code):
+    """A due venue that wasn't refetched (every retry failed, or no cached
+    response to reparse) stays counted with its carried shows, so those
+    go to the show datasets too."""
+    run = runs[date_code]
+    if venue_code in run["aggregator"].processed and venue_code not in run["fetched"]:
+        track_shows(date_code, schedule.last_shows(date_code, venue_code) or {})
+
+
+def retract_carried(date_code, venue_code, touched=None):
+    """Take a venue's carried-forward shows back out of the aggregates
+    before its fresh ones go in (a no-op if it wasn't counted yet)."""
+    aggregator = runs[date_code]["aggregator"]
+    if venue_code in aggregator.processed:
+        # Still the shows it was carried with: fresh ones are recorded after this
+        shows_by_movie = schedule.last_shows(date_code, venue_code) or {}
+        aggregator.remove_venue(venue_code, shows_by_movie, touched)
+
+
+def write_failure_report(failures):
+    """List the venue/dates that never succeeded this run."""
+    report = [
+        {
+            "venue_code": vcode,
+            "date": date_code,
+            "venue": ALL_VENUES.get(vcode, {}).get("VenueName", "Unknown"),
+            "city": ALL_VENUES.get(vcode, {}).get("City", "Unknown"),
+            "state": ALL_VENUES.get(vcode, {}).get("State", "Unknown"),
+            **info,
+        }
+        for (vcode, date_code), info in sorted(failures.items())
+    ]
+    with open(FAILED_VENUES_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if report:
+        print(f"❌ {len(report)} venue/dates never succeeded (see {FAILED_VENUES_FILE}):")
+        for r in report:
+            print(f"   {r['venue_code']} {r['venue']} ({r['city']}) {r['date']}: {r['error']}")
 
 
 # ---------------- MAIN ----------------
@@ -498,36 +566,104 @@ if __name__ == "__main__":
     with open("venues.json", "r", encoding="utf-8") as f:
         venues = json.load(f)
 
-    if os.path.exists("fetchedvenues.json"):
-        with open("fetchedvenues.json", "r", encoding="utf-8") as f:
-            fetched_venues = set(json.load(f))
-    else:
-        fetched_venues = set()
-
-    if os.path.exists("venues_data.json"):
-        with open("venues_data.json", "r", encoding="utf-8") as f:
-            try:
-                all_data = json.load(f)
-            except:
-                all_data = {}
-    else:
-        all_data = {}
+    if not REPARSE:
+        discard_stale_progress()
+    with open(SWEEP_DATES_FILE, "w", encoding="utf-8") as f:
+        json.dump(DATE_CODES, f)
+
+    if REPARSE and os.path.exists(JOURNAL_FILE):
+        os.remove(JOURNAL_FILE)
+    schedule = VenueSchedule(SCHEDULE_FILE, SCHEDULE_SHOWS_DB, DATE_CODES)
+    runs = {date_code: load_run(date_code) for date_code in DATE_CODES}
+    replayed = replay_journal(runs)
+    if replayed:
+        print(f"📂 Replayed {replayed} venues from {JOURNAL_FILE}")
+        compact_journal(runs)
+
+    if REPARSE:
+        # Offline: parse the cached responses again, nothing is fetched
+        for date_code in DATE_CODES:
+            reparsed = 0
+            for vcode, body in response_cache.items(date_code):
+                handle_venue(vcode, date_code, json.loads(body), body)
+                reparsed += 1
+            print(f"♻️ {date_code}: reparsed {reparsed} cached responses")
+
+    # Every venue starts from its last numbers; due ones are refetched
+    for date_code, run in runs.items():
+        carried = frozen = refreshing = 0
+        for vcode in venues.keys():
+            if vcode in run["fetched"] or vcode in run["aggregator"].processed:
+                continue
+            shows_by_movie = schedule.last_shows(date_code, vcode)
+            if shows_by_movie is None:
+                continue  # never fetched or shows lost
+            due = schedule.is_due(date_code, vcode)
+            carry_forward(date_code, vcode, shows_by_movie, due)
+            if due:
+                refreshing += 1
+            else:
+                carried += 1
+                frozen += schedule.is_frozen(date_code, vcode)
+        tiers = ", ".join(f"{t} {n}" for t, n in schedule.tier_counts(date_code).items())
+        print(
+            f"🗓 {date_code}: carrying forward {carried} venues not due yet, "
+            f"{frozen} of them frozen after their last show, and {refreshing} due "
+            f"until they are refetched ({tiers})"
+        )
 
+    # Every (venue, date) pair goes through one client and one adaptive limit
+    pending = [
+        (vcode, date_code)
+        for date_code, run in runs.items()
+        for vcode in venues.keys()
+        if vcode not in run["fetched"]
+    ]
     print(
-        f"🚀 Starting fetch with {NUM_WORKERS} workers. Already fetched: {len(fetched_venues)} venues"
+        f"🚀 Starting fetch with {CONCURRENCY} concurrent requests. Already fetched: "
+        f"{len(venues) * len(runs) - len(pending)} venue/dates, {len(pending)} to go"
     )
 
-    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
-        futures = [executor.submit(fetch_venue_safe, vcode) for vcode in venues.keys()]
-        for _ in as_completed(futures):
-            pass
+    failures = {}
+    if pending and not REPARSE:
+        failures = asyncio.run(
+            fetch_all(
+                API_URL,
+                pending,
+                handle_venue,
+                concurrency=CONCURRENCY,
+                headers=headers,
+                cookies=get_clearance_cookies(),
+            )
+        )
+    for vcode, date_code in pending:
+        keep_carried(date_code, vcode)
+    write_failure_report(failures)
 
-    # Instead, load the final updated movie_summary.json
-    with open("movie_summary.json", "r", encoding="utf-8") as f:
-        movie_summary = json.load(f)
+    compact_journal(runs)
+    print("✅ Final progress saved.")
+    for date_code in DATE_CODES:
+        merged = merge_parts(SHOWS_DIR, date_code)
+        if merged:
+            print(f"🗜 {date_code}: merged {merged} show part files into one per partition")
+
+    for date_code, run in runs.items():
+        if date_code == DATE_CODE:
+            continue
+        summary = run["aggregator"].snapshot()
+        df = pd.DataFrame([{"Movie": k, **v} for k, v in summary.items()])
+        if not df.empty:
+            df = df.sort_values(by="gross", ascending=False).reset_index(drop=True)
+        df.to_csv(state_file("movie_summary.csv", date_code), index=False)
+        gross = sum(stats["gross"] for stats in summary.values())
+        print(f"📅 {date_code}: {len(summary)} movies, gross {format_rgross(gross)}")
+
+    aggregator = runs[DATE_CODE]["aggregator"]
+    movie_summary = aggregator.snapshot()
 
     df = pd.DataFrame([{"Movie": k, **v} for k, v in movie_summary.items()])
-    df = df.sort_values(by="gross", ascending=False).reset_index(drop=True)
+    if not df.empty:
+        df = df.sort_values(by="gross", ascending=False).reset_index(drop=True)
     df.to_csv("movie_summary.csv", index=False)
 
     def pretty_divider(title=""):
@@ -543,52 +679,27 @@ if __name__ == "__main__":
     pretty_divider("Language-wise Summary")
 
     console_rows = []
-    lang_summary = {}
-
-    for movie, stats in movie_summary.items():
-        # Split "Title [Dimension | Language]" back into title + language
-        if "[" in movie and "|" in movie:
-            base_title = movie.split("[")[0].strip()
-            lang = movie.split("|")[-1].replace("]", "").strip()
-        else:
-            base_title = movie.strip()
-            lang = "Unknown"
-
-        key = (base_title, lang)
-
-        if key not in lang_summary:
-            lang_summary[key] = {"shows": 0, "gross": 0.0, "sold": 0, "totalSeats": 0}
-
-        lang_summary[key]["shows"] += stats["shows"]
-        lang_summary[key]["gross"] += stats["gross"]
-        lang_summary[key]["sold"] += stats["sold"]
-        lang_summary[key]["totalSeats"] += stats["totalSeats"]
+    lang_summary = aggregator.rollup(lambda info: (info.title, info.language or "Unknown"))
 
     for (title, lang), stats in lang_summary.items():
-        occ = (
-            round(stats["sold"] / stats["totalSeats"] * 100, 2)
-            if stats["totalSeats"]
-            else 0
-        )
-        atp = round(stats["gross"] / stats["sold"], 2) if stats["sold"] else 0
-        rgross = format_rgross(stats["gross"])
         console_rows.append(
             {
                 "Movie (Lang)": f"{title} ({lang})",
-                "Shows": stats["shows"],
-                "Gross": round(stats["gross"], 2),
-                "Sold": stats["sold"],
-                "TotalSeats": stats["totalSeats"],
-                "ATP": atp,
-                "Occ%": occ,
-                "RGross": rgross,
+                "Shows": stats.shows,
+                "Gross": round(stats.gross, 2),
+                "Sold": stats.sold,
+                "TotalSeats": stats.total_seats,
+                "ATP": stats.atp,
+                "Occ%": stats.occupancy,
+                "RGross": format_rgross(stats.gross),
             }
         )
 
     df_console = pd.DataFrame(console_rows)
-    df_console = df_console.sort_values(by="Gross", ascending=False).reset_index(
-        drop=True
-    )
+    if not df_console.empty:
+        df_console = df_console.sort_values(by="Gross", ascending=False).reset_index(
+            drop=True
+        )
     print(df_console.to_string(index=False))
 
     # ------------------------------------------------------
@@ -597,57 +708,30 @@ if __name__ == "__main__":
     pretty_divider("Movie-wise Summary")
 
     movie_only_rows = []
-    movie_only_summary = {}
-
-    for movie, stats in movie_summary.items():
-        if "[" in movie:
-            base_title = movie.split("[")[0].strip()
-        else:
-            base_title = movie.strip()
-
-        if base_title not in movie_only_summary:
-            movie_only_summary[base_title] = {
-                "shows": 0,
-                "gross": 0.0,
-                "sold": 0,
-                "totalSeats": 0,
-            }
-
-        movie_only_summary[base_title]["shows"] += stats["shows"]
-        movie_only_summary[base_title]["gross"] += stats["gross"]
-        movie_only_summary[base_title]["sold"] += stats["sold"]
-        movie_only_summary[base_title]["totalSeats"] += stats["totalSeats"]
+    movie_only_summary = aggregator.rollup(lambda info: info.title)
 
     for title, stats in movie_only_summary.items():
-        occ = (
-            round(stats["sold"] / stats["totalSeats"] * 100, 2)
-            if stats["totalSeats"]
-            else 0
-        )
-        atp = round(stats["gross"] / stats["sold"], 2) if stats["sold"] else 0
-        rgross = format_rgross(stats["gross"])
         movie_only_rows.append(
             {
                 "Movie": title,
-                "Shows": stats["shows"],
-                "Gross": round(stats["gross"], 2),
-                "Sold": stats["sold"],
-                "TotalSeats": stats["totalSeats"],
-                "ATP": atp,
-                "Occ%": occ,
-                "RGross": rgross,
+                "Shows": stats.shows,
+                "Gross": round(stats.gross, 2),
+                "Sold": stats.sold,
+                "TotalSeats": stats.total_seats,
+                "ATP": stats.atp,
+                "Occ%": stats.occupancy,
+                "RGross": format_rgross(stats.gross),
             }
         )
 
     df_movie_only = pd.DataFrame(movie_only_rows)
-    df_movie_only = df_movie_only.sort_values(by="Gross", ascending=False).reset_index(
-        drop=True
-    )
+    if not df_movie_only.empty:
+        df_movie_only = df_movie_only.sort_values(by="Gross", ascending=False).reset_index(
+            drop=True
+        )
     print(df_movie_only.to_string(index=False))
     pretty_divider("Format & Language-wise Summary")
 
     print("✅ Movie summary saved to movie_summary.csv")
-    dump_progress(all_data, fetched_venues)
-    print("✅ Final progress saved.")
 
 
@@ -0,0 +1,187 @@
+from collections import Counter
+from box_office import BoxOfficeStats
+from records import intern_movie
+
+
+# ---------------- AGGREGATOR ----------------
+class MovieAggregator:
+    """Running movie summary for one scrape, kept in memory.
+
+    Each venue's `shows_by_movie` is folded in as it arrives, so the cost
+    of a venue is proportional to its own shows. Movies are keyed by
+    MovieInfo.key, (parent_event_code, child_event_code, dimension,
+    language), and every level is a BoxOfficeStats, with city and chain
+    blocks keyed by (city, state) / chain:
+
+        movies[key] = {"info": MovieInfo, "totals": stats,
+                       "details": {(city, state): stats},
+                       "Chain_details": {chain: stats}}
+
+    names() gives the movie_summary.json key of each movie.
+
+    rollup() sums the movies up to any of their attributes (title,
+    title + language ...).
+
+    A venue counted with stale shows is retracted with remove_venue()
+    before its fresh shows are added. Blocks left without venues are kept
+    (so live updates can zero them) but left out of snapshot().
+
+    snapshot() materializes the movie_summary.json layout (arrays, city
+    blocks sorted by gross). Pass a previously saved summary + processed
+    venue list to resume a run.
+    """
+
+    def __init__(self, venues_info, summary=None, processed=None):
+        self.venues_info = venues_info
+        self.processed = set(processed or ())
+        self.movies = {}
+        if summary:
+            self.merge(summary)
+
+    def _buckets(self, info):
+        buckets = self.movies.get(info.key)
+        if buckets is None:
+            buckets = self.movies[info.key] = {
+                "info": info,
+                "totals": BoxOfficeStats(),
+                "details": {},
+                "Chain_details": {},
+            }
+        return buckets
+
+    def _fold(self, venue_code, shows_by_movie, apply, touched):
+        venue_meta = self.venues_info.get(venue_code, {})
+        city = venue_meta.get("City", "Unknown")
+        state = venue_meta.get("State", "Unknown")
+        touched = {} if touched is None else touched
+
+        for movie, shows in shows_by_movie.items():
+            # The venue's own numbers once, then applied to every level
+            stats = BoxOfficeStats.of_shows(shows, venues=1)
+            chain = shows[0].chain
+            buckets = self._buckets(shows[0].movie_info)
+            apply(buckets["totals"], stats)
+            for blocks, key in ((buckets["details"], (city, state)), (buckets["Chain_details"], chain)):
+                block = blocks.get(key)
+                if block is None:
+                    block = blocks[key] = BoxOfficeStats()
+                apply(block, stats)
+
+            city_keys, chain_keys = touched.setdefault(movie, (set(), set()))
+            city_keys.add((city, state))
+            chain_keys.add(chain)
+
+        return touched
+
+    def add_venue(self, venue_code, shows_by_movie, touched=None):
+        """Fold one venue ({movie: [records.Show]}) into the summary.
+
+        Returns {movie: (city keys, chain keys)} of the blocks that
+        changed (added to `touched` if given), or None if the venue was
+        already counted.
+        """
+        if venue_code in self.processed:
+            return None
+        self.processed.add(venue_code)
+        return self._fold(venue_code, shows_by_movie, BoxOfficeStats.merge, touched)
+
+    def remove_venue(self, venue_code, shows_by_movie, touched=None):
+        """Take back the shows a venue was counted with (same return value
+        as add_venue, None if the venue wasn't counted)."""
+        if venue_code not in self.processed:
+            return None
+        self.processed.discard(venue_code)
+        return self._fold(venue_code, shows_by_movie, BoxOfficeStats.subtract, touched)
+
+    def merge(self, summary):
+        """Add a partial summary (movie_summary.json layout) of other venues,
+        e.g. another shard's, into this one.
+
+        Counts add up and occupancy / the city count are derived from
+        them, so partial summaries can be merged in any order or grouping.
+        """
+        for data in summary.values():
+            buckets = self._buckets(intern_movie(
+                data["title"], data["parent_event_code"], data["child_event_code"],
+                data["dimension"], data["language"],
+            ))
+            buckets["totals"].merge(BoxOfficeStats.from_dict(data))
+            for blocks, label, entries in (
+                (buckets["details"], lambda d: (d["city"], d["state"]), data.get("details", [])),
+                (buckets["Chain_details"], lambda d: d["chain"], data.get("Chain_details", [])),
+            ):
+                for d in entries:
+                    key = label(d)
+                    blocks[key] = blocks.get(key, BoxOfficeStats()).merge(BoxOfficeStats.from_dict(d))
+
+    def entry(self, movie, city_keys=None, chain_keys=None):
+        """One movie in movie_summary.json layout, with only the given
+        city / chain blocks if any are passed (for live updates)."""
+        buckets = self.movies[movie]
+        info, details, chains = buckets["info"], buckets["details"], buckets["Chain_details"]
+        return {
+            "title": info.title,
+            "parent_event_code": info.parent_event_code,
+            "child_event_code": info.child_event_code,
+            "dimension": info.dimension,
+            "language": info.language,
+            **buckets["totals"].to_dict(),
+            "cities": sum(1 for block in details.values() if block.venues),
+            "details": [
+                {"city": city, "state": state, **details[(city, state)].to_dict()}
+                for city, state in (details if city_keys is None else city_keys)
+            ],
+            "Chain_details": [
+                {"chain": chain, **chains[chain].to_dict()}
+                for chain in (chains if chain_keys is None else chain_keys)
+            ],
+        }
+
+    def names(self, movies=None):
+        """Summary key of each movie (all counted ones, or `movies`): its
+        display name, with the child event code appended to every format
+        sharing that name (same title, dimension and language), so a key
+        never depends on the order formats arrived in."""
+        shared = Counter(
+            b["info"].movie for b in self.movies.values() if b["totals"].venues
+        )
+        names = {}
+        for movie in self.movies if movies is None else movies:
+            buckets = self.movies[movie]
+            info = buckets["info"]
+            if movies is None and not buckets["totals"].venues:
+                continue
+            # A format that just lost its last venue still counts as sharing
+            if shared[info.movie] + (not buckets["totals"].venues) > 1:
+                names[movie] = f"{info.movie} ({info.child_event_code})"
+            else:
+                names[movie] = info.movie
+        return names
+
+    def snapshot(self):
+        """The summary in movie_summary.json layout: movies, city blocks and
+        chain blocks sorted by gross, ties by name, so the same numbers give
+        the same bytes whatever order the venues were folded in."""
+        names = self.names()
+        summary = {}
+        for movie in sorted(names, key=lambda m: (-self.movies[m]["totals"].gross, names[m])):
+            buckets = self.movies[movie]
+            stats = self.entry(
+                movie,
+                [key for key, block in buckets["details"].items() if block.venues],
+                [key for key, block in buckets["Chain_details"].items() if block.venues],
+            )
+            stats["details"].sort(key=lambda x: (-x["gross"], x["city"], x["state"]))
+            stats["Chain_details"].sort(key=lambda x: (-x["gross"], x["chain"] or ""))
+            summary[names[movie]] = stats
+        return summary
+
+    def rollup(self, label):
+        """{label(MovieInfo): BoxOfficeStats} of the movie totals, e.g.
+        label=lambda info: (info.title, info.language) for title + language."""
+        rolled = {}
+        for buckets in self.movies.values():
+            if buckets["totals"].venues:
+                key = label(buckets["info"])
+                rolled[key] = rolled.get(key, BoxOfficeStats()).merge(buckets["totals"])
+        return rolled
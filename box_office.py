@@ -0,0 +1,120 @@
+import numpy as np
+
+# A show is fast filling from 50% occupancy and housefull from 98%
+FASTFILLING = 50
+HOUSEFULL = 98
+
+
+# ---------------- STATS ----------------
+class BoxOfficeStats:
+    """Counters of a set of shows (a venue, city, chain, movie ...).
+
+    Every field is a plain sum, so stats of disjoint sets of shows merge
+    by adding them (in any order, e.g. from parallel shards) and a venue's
+    old stats are retracted by subtracting them. Occupancy and ATP are
+    derived from the sums when read.
+    """
+
+    __slots__ = ("venues", "shows", "gross", "sold", "total_seats", "fastfilling", "housefull")
+
+    def __init__(self, venues=0, shows=0, gross=0.0, sold=0, total_seats=0, fastfilling=0, housefull=0):
+        self.venues = venues
+        self.shows = shows
+        self.gross = gross
+        self.sold = sold
+        self.total_seats = total_seats
+        self.fastfilling = fastfilling
+        self.housefull = housefull
+
+    @classmethod
+    def of_shows(cls, shows, venues=0):
+        """Stats of records.Show objects."""
+        stats = cls(venues)
+        for show in shows:
+            stats.add_show(show.sold, show.total, show.gross)
+        return stats
+
+    def add_show(self, sold, total, gross):
+        occ = (sold / total * 100) if total > 0 else 0
+        self.shows += 1
+        self.gross += gross
+        self.sold += sold
+        self.total_seats += total
+        if FASTFILLING <= occ < HOUSEFULL:
+            self.fastfilling += 1
+        elif occ >= HOUSEFULL:
+            self.housefull += 1
+
+    def merge(self, other):
+        for field in self.__slots__:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def subtract(self, other):
+        for field in self.__slots__:
+            setattr(self, field, getattr(self, field) - getattr(other, field))
+        return self
+
+    @property
+    def occupancy(self):
+        if self.total_seats > 0:
+            return round(self.sold / self.total_seats * 100, 2)
+        return 0.0
+
+    @property
+    def atp(self):
+        """Average ticket price."""
+        return round(self.gross / self.sold, 2) if self.sold else 0
+
+    def to_dict(self):
+        """Fields as in movie_summary.json."""
+        return {
+            "venues": self.venues,
+            "shows": self.shows,
+            "gross": self.gross,
+            "sold": self.sold,
+            "totalSeats": self.total_seats,
+            "fastfilling": self.fastfilling,
+            "housefull": self.housefull,
+            "occupancy": self.occupancy,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d.get("venues", 0),
+            d.get("shows", 0),
+            d.get("gross", 0.0),
+            d.get("sold", 0),
+            d.get("totalSeats", 0),
+            d.get("fastfilling", 0),
+            d.get("housefull", 0),
+        )
+
+
+def group_stats(df, by):
+    """{group key: BoxOfficeStats} of a show DataFrame (total / sold / gross
+    columns, venue for the venue count), in one vectorized pass."""
+    total = df["total"].to_numpy(dtype=float)
+    sold = df["sold"].to_numpy(dtype=float)
+    occ = np.divide(sold * 100, total, out=np.zeros_like(total), where=total > 0)
+    columns = df.assign(
+        fastfilling=((occ >= FASTFILLING) & (occ < HOUSEFULL)).astype(int),
+        housefull=(occ >= HOUSEFULL).astype(int),
+    ).groupby(by)
+    sums = columns.agg(
+        shows=("total", "size"),
+        gross=("gross", "sum"),
+        sold=("sold", "sum"),
+        total_seats=("total", "sum"),
+        fastfilling=("fastfilling", "sum"),
+        housefull=("housefull", "sum"),
+    )
+    sums["venues"] = columns["venue"].nunique() if "venue" in df else 0
+    return {
+        key: BoxOfficeStats(
+            int(row.venues), int(row.shows), float(row.gross), int(row.sold),
+            int(row.total_seats), int(row.fastfilling), int(row.housefull),
+        )
+        for key, row in zip(sums.index, sums.itertuples(index=False))
+    }
@@ -1,9 +1,15 @@
-import ijson
+import sys
 import pandas as pd
 from tabulate import tabulate
+from box_office import BoxOfficeStats, group_stats
+from show_store import latest_date, read_shows
 
-file_path = "all_shows.json"
-filtered_rows = []
+# Show-level Parquet dataset written by Main.py: shows/date=<date>/event=<event>/
+# usage: python city.py [EVENT_CODE] [DATE_CODE]  (default: latest date)
+SHOWS_DIR = "shows"
+COLUMNS = ["venue", "city", "state", "language", "dimension", "total", "sold", "gross"]
+event_code = sys.argv[1] if len(sys.argv) > 1 else "EG00376057"
+date_code = sys.argv[2] if len(sys.argv) > 2 else latest_date(SHOWS_DIR)
 
 # ======================
 # Helper: Format numbers in Indian style
@@ -21,155 +27,73 @@ def format_indian_number(num):
 
 
 # ======================
-# Load JSON
+# Load Parquet (only the columns used below, already typed)
 # ======================
-with open(file_path, "r", encoding="utf-8") as f:
-    for item in ijson.items(f, "item"):
-        item["fastfilling"] = 1 if 50 <= item["occupancy"] < 98 else 0
-        item["housefull"] = 1 if item["occupancy"] >= 98 else 0
-        filtered_rows.append(item)
-
-df_filtered = pd.DataFrame(filtered_rows)
+df_filtered = read_shows(SHOWS_DIR, date_code, event_code, COLUMNS).to_pandas()
 
 # Ensure numeric columns
-numeric_cols = ["total", "sold", "gross", "occupancy", "fastfilling", "housefull"]
+numeric_cols = ["total", "sold", "gross"]
 for col in numeric_cols:
     df_filtered[col] = pd.to_numeric(df_filtered[col], errors="coerce").fillna(0)
 
 
+# ======================
+# Helpers: one table row per BoxOfficeStats
+# ======================
+def summary_row(labels, stats):
+    return {
+        **labels,
+        "totalShows": stats.shows,
+        "totalGross": format_indian_number(stats.gross),
+        "totalSold": f"{stats.sold:,.0f}",
+        "totalSeats": f"{stats.total_seats:,.0f}",
+        "fastfilling": stats.fastfilling,
+        "housefull": stats.housefull,
+        "avgOccupancy": f"{stats.occupancy}%",
+    }
+
+
+def grouped_summary(df, group_cols):
+    """Rows of every group sorted by the first column, then gross, plus a
+    grand total (the groups merged) at the bottom."""
+    groups = group_stats(df, group_cols)
+    grand_total = BoxOfficeStats()
+    for stats in groups.values():
+        grand_total.merge(stats)
+
+    rows = [
+        summary_row(dict(zip(group_cols, key)), stats)
+        for key, stats in sorted(groups.items(), key=lambda g: (g[0][0], -g[1].gross))
+    ]
+    rows.append(summary_row(
+        {group_cols[0]: "Grand Total", **{col: "" for col in group_cols[1:]}}, grand_total
+    ))
+    return pd.DataFrame(rows)
+
+
 # ======================
 # City-wise summary grouped by state
 # ======================
 def make_city_summary(df):
-    summary = df.groupby(["state", "city"]).agg(
-        totalShows=("venue", "count"),
-        totalGross=("gross", "sum"),
-        totalSold=("sold", "sum"),
-        totalSeats=("total", "sum"),
-        fastfilling=("fastfilling", "sum"),
-        housefull=("housefull", "sum"),
-        avgOccupancy=("occupancy", "mean")
-    ).reset_index()
-
-    # Grand Total
-    grand_total = pd.DataFrame({
-        "state": ["Grand Total"],
-        "city": [""],
-        "totalShows": [summary["totalShows"].sum()],
-        "totalGross": [summary["totalGross"].sum()],
-        "totalSold": [summary["totalSold"].sum()],
-        "totalSeats": [summary["totalSeats"].sum()],
-        "fastfilling": [summary["fastfilling"].sum()],
-        "housefull": [summary["housefull"].sum()],
-        "avgOccupancy": [
-            summary["totalSold"].sum() / summary["totalSeats"].sum() * 100 
-            if summary["totalSeats"].sum() > 0 else 0
-        ]
-    })
-
-    summary = pd.concat([summary, grand_total], ignore_index=True)
-
-    # Round avgOccupancy
-    summary["avgOccupancy"] = summary["avgOccupancy"].round(2).astype(str) + "%"
-
-    # Helper for sorting
-    summary["_grossNum"] = summary["totalGross"]
-
-    # Format numbers
-    summary["totalGross"] = summary["_grossNum"].apply(format_indian_number)
-    summary["totalSold"] = summary["totalSold"].apply(lambda x: f"{x:,.0f}")
-    summary["totalSeats"] = summary["totalSeats"].apply(lambda x: f"{x:,.0f}")
-
-    # Sort by state + gross
-    body = summary.iloc[:-1].sort_values(
-        by=["state", "_grossNum"], ascending=[True, False]
-    )
-    summary = pd.concat([body, summary.iloc[[-1]]], ignore_index=True)
-
-    return summary.drop(columns=["_grossNum"])
+    return grouped_summary(df, ["state", "city"])
 
 
 # ======================
 # Language + Dimension summary
 # ======================
 def make_lang_dim_summary(df):
-    summary = df.groupby(["language", "dimension"]).agg(
-        totalShows=("venue", "count"),
-        totalGross=("gross", "sum"),
-        totalSold=("sold", "sum"),
-        totalSeats=("total", "sum"),
-        fastfilling=("fastfilling", "sum"),
-        housefull=("housefull", "sum"),
-        avgOccupancy=("occupancy", "mean")
-    ).reset_index()
-
-    # Grand Total
-    grand_total = pd.DataFrame({
-        "language": ["Grand Total"],
-        "dimension": [""],
-        "totalShows": [summary["totalShows"].sum()],
-        "totalGross": [summary["totalGross"].sum()],
-        "totalSold": [summary["totalSold"].sum()],
-        "totalSeats": [summary["totalSeats"].sum()],
-        "fastfilling": [summary["fastfilling"].sum()],
-        "housefull": [summary["housefull"].sum()],
-        "avgOccupancy": [
-            summary["totalSold"].sum() / summary["totalSeats"].sum() * 100 
-            if summary["totalSeats"].sum() > 0 else 0
-        ]
-    })
-
-    summary = pd.concat([summary, grand_total], ignore_index=True)
-
-    # Round avgOccupancy
-    summary["avgOccupancy"] = summary["avgOccupancy"].round(2).astype(str) + "%"
-
-    # Helper for sorting
-    summary["_grossNum"] = summary["totalGross"]
-
-    # Format numbers
-    summary["totalGross"] = summary["_grossNum"].apply(format_indian_number)
-    summary["totalSold"] = summary["totalSold"].apply(lambda x: f"{x:,.0f}")
-    summary["totalSeats"] = summary["totalSeats"].apply(lambda x: f"{x:,.0f}")
-
-    # Sort by language + gross
-    body = summary.iloc[:-1].sort_values(
-        by=["language", "_grossNum"], ascending=[True, False]
-    )
-    summary = pd.concat([body, summary.iloc[[-1]]], ignore_index=True)
-
-    return summary.drop(columns=["_grossNum"])
+    return grouped_summary(df, ["language", "dimension"])
 
 
 # ======================
 # Top 20 Most Grossed Cities
 # ======================
 def make_top_cities(df, top_n=20):
-    summary = df.groupby(["state", "city"]).agg(
-        totalShows=("venue", "count"),
-        totalGross=("gross", "sum"),
-        totalSold=("sold", "sum"),
-        totalSeats=("total", "sum"),
-        fastfilling=("fastfilling", "sum"),
-        housefull=("housefull", "sum"),
-        avgOccupancy=("occupancy", "mean")
-    ).reset_index()
-
-    # Sort by gross and take top N
-    summary = summary.sort_values(by="totalGross", ascending=False).head(top_n)
-
-    # Round avgOccupancy
-    summary["avgOccupancy"] = summary["avgOccupancy"].round(2).astype(str) + "%"
-
-    # Helper
-    summary["_grossNum"] = summary["totalGross"]
-
-    # Format numbers
-    summary["totalGross"] = summary["_grossNum"].apply(format_indian_number)
-    summary["totalSold"] = summary["totalSold"].apply(lambda x: f"{x:,.0f}")
-    summary["totalSeats"] = summary["totalSeats"].apply(lambda x: f"{x:,.0f}")
-
-    return summary.drop(columns=["_grossNum"])
+    groups = group_stats(df, ["state", "city"])
+    top = sorted(groups.items(), key=lambda g: g[1].gross, reverse=True)[:top_n]
+    return pd.DataFrame([
+        summary_row({"state": state, "city": city}, stats) for (state, city), stats in top
+    ])
 
 
 # ======================
@@ -0,0 +1,133 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import argparse
+import subprocess
+from aggregate import MovieAggregator
+from show_store import clear_date, merge_parts
+from snapshot import dated_path, write_json
+from scraper_runner import SHOWS_DIR, clean_temp_files
+
+# ---------------- CONFIG ----------------
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+SCRAPER_SCRIPT = os.path.join(BASE_PATH, "Main.py")
+VENUES_PATH = os.path.join(BASE_PATH, "venues.json")
+SHARDS_DIR = os.path.join(BASE_PATH, "shards")
+SHARD_KEY = "State"  # venues.json field shards are cut along (State / RegionCode)
+
+
+# ---------------- SHARDING ----------------
+def assign_shards(venues, shards, key=SHARD_KEY):
+    """Split venues into `shards` groups without splitting a State (or
+    RegionCode): biggest groups first, each to the emptiest shard."""
+    groups = {}
+    for vcode, info in venues.items():
+        groups.setdefault(info.get(key, "Unknown"), {})[vcode] = info
+
+    parts = [{} for _ in range(shards)]
+    for _, group in sorted(groups.items(), key=lambda g: (-len(g[1]), g[0])):
+        min(parts, key=len).update(group)
+    return parts
+
+
+def shard_path(i):
+    return os.path.join(SHARDS_DIR, f"shard-{i}")
+
+
+def run_shards(venues, shards, dates, key=SHARD_KEY, resume=False):
+    """Run one Main.py per shard, each in its own directory (so it has its
+    own venues.json, journal, schedule and response cache), in parallel.
+    With `resume` each shard picks up the progress files and journal an
+    unfinished run left in its directory."""
+    workers = []
+    for i, part in enumerate(assign_shards(venues, shards, key)):
+        path = shard_path(i)
+        os.makedirs(path, exist_ok=True)
+        if not resume:
+            clean_temp_files(path)
+        write_json(os.path.join(path, "venues.json"), part, indent=2)
+        log = open(os.path.join(path, "scraper.log"), "w", encoding="utf-8")
+        print(f"🚀 Shard {i}: {len(part)} venues → {path}")
+        workers.append((i, log, subprocess.Popen(
+            [sys.executable, SCRAPER_SCRIPT, *dates], cwd=path, stdout=log, stderr=subprocess.STDOUT,
+        )))
+
+    failed = []
+    for i, log, worker in workers:
+        if worker.wait() != 0:
+            failed.append(i)
+            print(f"❌ Shard {i} exited with {worker.returncode} (see {log.name})")
+        log.close()
+    return [shard_path(i) for i in range(shards)], failed
+
+
+# ---------------- MERGE ----------------
+def merge_shards(paths, out=BASE_PATH):
+    """Merge the outputs of shard directories into `out`, laid out as if a
+    single Main.py had swept every venue."""
+    with open(os.path.join(paths[0], "sweep_dates.json"), "r", encoding="utf-8") as f:
+        dates = json.load(f)
+
+    for i, date_code in enumerate(dates):
+        name = "movie_summary.json" if i == 0 else dated_path("movie_summary.json", date_code)
+        merged = MovieAggregator({})
+        for path in paths:
+            summary_path = os.path.join(path, name)
+            if os.path.exists(summary_path):
+                with open(summary_path, "r", encoding="utf-8") as f:
+                    merged.merge(json.load(f))
+        write_json(os.path.join(out, name), merged.snapshot(), indent=2)
+        print(f"🧩 {date_code}: merged {len(paths)} shards into {name} ({len(merged.movies)} movies)")
+
+    # Show-level Parquet parts, renamed per shard inside the same partitions
+    # (replacing whatever an earlier run left there for these dates), then
+    # merged into one file per partition
+    for date_code in dates:
+        clear_date(os.path.join(out, SHOWS_DIR), date_code)
+    for n, path in enumerate(paths):
+        for part in glob.glob(os.path.join(path, SHOWS_DIR, "date=*", "event=*", "*.parquet")):
+            partition = os.path.relpath(os.path.dirname(part), path)
+            os.makedirs(os.path.join(out, partition), exist_ok=True)
+            shutil.copyfile(part, os.path.join(out, partition, f"shard{n}-{os.path.basename(part)}"))
+    for date_code in dates:
+        merge_parts(os.path.join(out, SHOWS_DIR), date_code)
+
+    failures = []
+    for path in paths:
+        report = os.path.join(path, "failed_venues.json")
+        if os.path.exists(report):
+            with open(report, "r", encoding="utf-8") as f:
+                failures.extend(json.load(f))
+    write_json(os.path.join(out, "failed_venues.json"), failures, indent=2)
+    write_json(os.path.join(out, "sweep_dates.json"), dates)
+
+
+# ---------------- ENTRY ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sweep venues with several Main.py workers and merge their summaries."
+    )
+    parser.add_argument("dates", nargs="*", help="passed to Main.py (e.g. 20251002-20251005)")
+    parser.add_argument("--shards", type=int, default=os.cpu_count(), help="local workers to run")
+    parser.add_argument("--by", default=SHARD_KEY, help="venues.json field to shard by")
+    parser.add_argument(
+        "--merge", nargs="+", metavar="DIR",
+        help="only merge these shard directories (e.g. gathered from other machines)",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="keep the progress files of an unfinished run in the shard directories",
+    )
+    args = parser.parse_args()
+
+    if args.merge:
+        merge_shards(args.merge)
+        sys.exit(0)
+
+    with open(VENUES_PATH, "r", encoding="utf-8") as f:
+        venues = json.load(f)
+    paths, failed = run_shards(venues, args.shards, args.dates, args.by, args.resume)
+    merge_shards(paths)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,198 @@
+import json
+import time
+import random
+import asyncio
+import httpx
+from email.utils import parsedate_to_datetime
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+DEFAULT_CONCURRENCY = 128  # ceiling for the adaptive limit
+INITIAL_CONCURRENCY = 8
+REQUEST_TIMEOUT = httpx.Timeout(20.0, connect=10.0)
+MAX_RETRY_AFTER = 120  # seconds; cap on how long one Retry-After may pause us
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0  # seconds before the first retry (before jitter)
+BACKOFF_CAP = 120.0
+
+
+# ---------------- ADAPTIVE LIMIT ----------------
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by upstream responses.
+
+    Starts at `initial` and grows by one per success (slow start) until the
+    first throttle, then by one per `limit` successes. A 429/5xx/timeout
+    halves the limit, at most once per round trip (responses to requests
+    sent before the last cut don't cut again), and a Retry-After pauses
+    new requests until it expires.
+    """
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, maximum=DEFAULT_CONCURRENCY,
+                 minimum=1, decrease=0.5):
+        self.limit = float(min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.slow_start = True
+        self.in_flight = 0
+        self.throttles = 0
+        self._last_cut = 0.0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a slot; returns the start time to pass to release()."""
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            async with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return time.monotonic()
+                await self._cond.wait()
+
+    async def release(self, started, throttled=False, retry_after=None):
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self._on_throttle(started, retry_after)
+            elif self.slow_start:
+                self.limit = min(self.maximum, self.limit + 1)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def _on_throttle(self, started, retry_after):
+        self.throttles += 1
+        if retry_after:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + min(retry_after, MAX_RETRY_AFTER)
+            )
+        if started < self._last_cut:
+            return  # already cut for this round trip
+        before = self.limit
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.slow_start = False
+        self._last_cut = time.monotonic()
+        print(f"🐢 Upstream throttling: concurrency {int(before)} → {int(self.limit)}")
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds (it may be a number or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+    return max(delay, retry_after or 0)
+
+
+# ---------------- CLIENT ----------------
+def make_client(concurrency, headers=None, cookies=None):
+    """One pooled keep-alive client shared by every request of a sweep."""
+    return httpx.AsyncClient(
+        http2=HTTP2,
+        headers=headers,
+        cookies=cookies,
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+        ),
+    )
+
+
+# ---------------- FETCH ----------------
+async def fetch_showtimes(client, url, venue_code, date_code):
+    """GET the showtimes-by-venue payload for one venue/date, as
+    (parsed JSON, raw body)."""
+    res = await client.get(url, params={"venueCode": venue_code, "dateCode": date_code})
+    res.raise_for_status()
+    return json.loads(res.content), res.content
+
+
+async def fetch_all(url, jobs, on_result,
+                    concurrency=DEFAULT_CONCURRENCY, headers=None, cookies=None,
+                    max_attempts=MAX_ATTEMPTS):
+    """Fetch every (venue_code, date_code) in `jobs` over one client, with
+    the number of requests in flight set by an AdaptiveLimiter whose
+    ceiling is `concurrency`. All dates of a sweep share the pool and limit.
+
+    A request that fails with a throttle/5xx, a transport error or a bad body
+    waits out an exponential backoff (off the limiter, so it holds no slot)
+    and is retried, up to `max_attempts` times; other 4xx are final.
+
+    `on_result(venue_code, date_code, data, body)` runs on the event loop
+    once per job with the parsed and raw response; both are None when
+    every attempt failed. An exception raised by it (a payload that can't be
+    parsed) fails only that job, which isn't retried. Returns
+    {(venue_code, date_code): {"attempts": n, "error": last error}} for those.
+    """
+    limiter = AdaptiveLimiter(maximum=concurrency)
+    failures = {}
+
+    async with make_client(concurrency, headers, cookies) as client:
+        async def fetch_one(venue_code, date_code):
+            job = (venue_code, date_code)
+            for attempt in range(1, max_attempts + 1):
+                started = await limiter.acquire()
+                throttled, retryable, retry_after, data = False, False, None, None
+                try:
+                    data, body = await fetch_showtimes(client, url, venue_code, date_code)
+                except httpx.HTTPStatusError as e:
+                    throttled = retryable = e.response.status_code in THROTTLE_STATUSES
+                    retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                    error = f"HTTP {e.response.status_code}"
+                except httpx.TransportError as e:  # timeouts, resets, refused
+                    throttled = retryable = True
+                    error = repr(e)
+                except (httpx.HTTPError, ValueError) as e:
+                    retryable = isinstance(e, ValueError)  # truncated / non-JSON body
+                    error = repr(e)
+                finally:
+                    await limiter.release(started, throttled, retry_after)
+
+                if data is not None:
+                    failures.pop(job, None)
+                    try:
+                        on_result(venue_code, date_code, data, body)
+                    except Exception as e:
+                        failures[job] = {"attempts": attempt, "error": f"handler: {e!r}"}
+                        print(f"❌ Could not handle {venue_code}/{date_code}: {e!r}")
+                    return
+
+                failures[job] = {"attempts": attempt, "error": error}
+                if not retryable or attempt == max_attempts:
+                    break
+                delay = backoff_delay(attempt, retry_after)
+                print(f"⚠️ Failed {venue_code}/{date_code} ({error}), retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+            print(f"❌ Giving up on {venue_code}/{date_code} after {failures[job]['attempts']} attempts")
+            on_result(venue_code, date_code, None, None)
+
+        await asyncio.gather(*(fetch_one(v, d) for v, d in jobs))
+
+    print(
+        f"📶 Sweep done: concurrency settled at {int(limiter.limit)}, "
+        f"{limiter.throttles} throttled responses, {len(failures)} requests failed"
+    )
+    return failures
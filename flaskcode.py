@@ -1,115 +1,305 @@
-import os
-import json
-import time
-import threading
-from datetime import datetime
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
-
-# ---------------- CONFIG ----------------
-BASE_PATH = os.path.dirname(os.path.abspath(__file__))
-DATA_FILE = os.path.join(BASE_PATH, "data.json")
-SCRAPER_INTERVAL = 60 * 60  # 1 hour
-
-
-# ---------------- FUNCTIONS ----------------
-def clean_temp_files():
-    """Remove temp files before each scrape."""
-    temp_files = ["temp.json", "output.json"]
-    for file in temp_files:
-        file_path = os.path.join(BASE_PATH, file)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🗑 Removed: {file}")
-
-
-def run_scraper():
-    """Run scraper script once and save data.json."""
-    try:
-        # Example: Replace with your actual scraper call
-        os.system(f"python3 {os.path.join(BASE_PATH, 'scraper_runner.py')}")
-        print("✅ Scraper run completed.")
-    except Exception as e:
-        print(f"❌ Scraper error: {e}")
-
-
-def run_scraper_periodically():
-    """Run scraper periodically in background thread."""
-    while True:
-        clean_temp_files()
-        run_scraper()
-        print(f"⏱ Waiting {SCRAPER_INTERVAL/60} minutes before next run...")
-        time.sleep(SCRAPER_INTERVAL)
-
-
-# ---------------- LIFESPAN ----------------
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    print("🚀 App starting...")
-
-    # Start background thread for scraper
-    threading.Thread(target=run_scraper_periodically, daemon=True).start()
-
-    yield  # App runs here
-
-    print("🛑 App shutting down...")
-
-
-# ---------------- APP ----------------
-app = FastAPI(
-    title="Movie Scraper API",
-    version="1.0.0",
-    lifespan=lifespan
-)
-
-# ---------------- CORS ----------------
-origins = [
-    "http://localhost:3000",   # local frontend
-    "https://bookmyshow-api.vercel.app"  # deployed frontend
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,  # use ["*"] for all origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# ---------------- ROUTES ----------------
-# ---------------- ROUTES ----------------
-@app.get("/movie-summary")
-def get_movie_summary():
-    """Serve processed data.json"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return JSONResponse({
-            "last_updated": datetime.now().strftime("%d/%m/%Y, %I:%M:%S %p"),
-            "data": data
-        })
-    else:
-        raise HTTPException(status_code=404, detail="data.json not found")
-
-
-@app.get("/raw-movie-summary")
-def get_raw_movie_summary():
-    """Serve raw movie_summary.json file"""
-    raw_file = os.path.join(BASE_PATH, "movie_summary.json")
-
-    if os.path.exists(raw_file):
-        with open(raw_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return JSONResponse({
-            "last_updated": datetime.now().strftime("%d/%m/%Y, %I:%M:%S %p"),
-            "data": data
-        })
-    else:
-        raise HTTPException(status_code=404, detail="movie_summary.json not found")
-
-
+import os
+import time
+import asyncio
+import threading
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from snapshot import SnapshotCache, dated_path, encode_json
+from live_feed import LiveFeed
+import scraper_runner
+
+# ---------------- CONFIG ----------------
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(BASE_PATH, "data.json")
+DATA_META_FILE = os.path.join(BASE_PATH, "data_meta.json")
+SNAPSHOT_HISTORY_FILE = os.path.join(BASE_PATH, "snapshot_history.json")
+RAW_DATA_FILE = os.path.join(BASE_PATH, "movie_summary.json")
+LIVE_FEED_FILE = os.path.join(BASE_PATH, "live_updates.jsonl")
+SSE_KEEPALIVE = 15  # seconds between comment pings on idle streams
+
+# Parsed + encoded summaries, reloaded only when the files change
+data_cache = SnapshotCache(DATA_FILE, DATA_META_FILE, history_path=SNAPSHOT_HISTORY_FILE)
+raw_data_cache = SnapshotCache(RAW_DATA_FILE, brotli_quality=5)
+dated_caches = {}  # date -> SnapshotCache of data_<date>.json (multi-date sweeps)
+
+# Per-venue updates from a running scrape, pushed to stream subscribers
+live_feed = LiveFeed(LIVE_FEED_FILE)
+
+
+# ---------------- FUNCTIONS ----------------
+def clean_temp_files():
+    """Remove temp files before each scrape."""
+    temp_files = ["temp.json", "output.json"]
+    for file in temp_files:
+        file_path = os.path.join(BASE_PATH, file)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"🗑 Removed: {file}")
+
+
+def run_scraper():
+    """Run one scrape (Main.py + publishing data.json, see scraper_runner)."""
+    try:
+        scraper_runner.run_once()
+        print("✅ Scraper run completed.")
+    except Exception as e:
+        print(f"❌ Scraper error: {e}")
+    finally:
+        # New run finished: rebuild cached snapshots here (not in the next
+        # request), even if mtime granularity hid the change
+        for cache in (data_cache, raw_data_cache, *list(dated_caches.values())):
+            cache.invalidate()
+            cache.refresh()
+
+
+def run_scraper_periodically():
+    """Run scraper periodically in background thread."""
+    while True:
+        clean_temp_files()
+        run_scraper()
+        print(f"⏱ Waiting {scraper_runner.SCRAPER_INTERVAL/60} minutes before next run...")
+        time.sleep(scraper_runner.SCRAPER_INTERVAL)
+
+
+# ---------------- LIFESPAN ----------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("🚀 App starting...")
+
+    # Start background thread for scraper
+    threading.Thread(target=run_scraper_periodically, daemon=True).start()
+    live_task = asyncio.create_task(live_feed.run())
+
+    yield  # App runs here
+
+    live_task.cancel()
+    print("🛑 App shutting down...")
+
+
+# ---------------- APP ----------------
+app = FastAPI(
+    title="Movie Scraper API",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# ---------------- CORS ----------------
+origins = [
+    "http://localhost:3000",   # local frontend
+    "https://bookmyshow-api.vercel.app"  # deployed frontend
+]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,  # use ["*"] for all origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    # Readable by the frontend: ETag to revalidate, the version for ?since=
+    expose_headers=["ETag", "X-Snapshot-Version"],
+)
+
+
+# ---------------- HELPERS ----------------
+def snapshot_response(snapshot, request, nested=True):
+    """Answer from a cached snapshot, honouring If-None-Match / If-Modified-Since
+    and serving a precompressed body when Accept-Encoding allows it."""
+    encoding, body, etag = snapshot.encoded(request.headers.get("accept-encoding"), nested)
+    headers = snapshot.headers(etag)
+    if snapshot.is_not_modified(
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def query_response(snapshot, request, data=None, body=None):
+    """Answer a view computed from a snapshot (a lookup result or a pre-built body).
+
+    Uses the snapshot's validators, so clients can revalidate these too.
+    """
+    headers = snapshot.headers()
+    if snapshot.is_not_modified(
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=304, headers=headers)
+
+    if body is None:
+        body = encode_json({
+            "last_updated": snapshot.body_last_updated,
+            "data": data
+        })
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def summary_response(snapshot, request, fields, nested, limit, cursor):
+    """Full / totals-only documents come precompressed; other shapes are
+    assembled from the snapshot's pre-encoded per-movie fragments."""
+    if fields is None and limit is None and cursor is None:
+        return snapshot_response(snapshot, request, nested)
+
+    try:
+        body = snapshot.projection(
+            [f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            nested,
+            limit,
+            cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return query_response(snapshot, request, body=body)
+
+
+def published_snapshot(date=None):
+    if date is None:
+        cache = data_cache
+    else:
+        path = dated_path(DATA_FILE, date)
+        cache = dated_caches.get(date)
+        if cache is None:
+            if not os.path.exists(path):
+                raise HTTPException(status_code=404, detail=f"{os.path.basename(path)} not found")
+            cache = dated_caches[date] = SnapshotCache(
+                path,
+                dated_path(DATA_META_FILE, date),
+                history_path=dated_path(SNAPSHOT_HISTORY_FILE, date),
+            )
+    snapshot = cache.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"{os.path.basename(cache.path)} not found")
+    return snapshot
+
+
+# ---------------- ROUTES ----------------
+# ---------------- ROUTES ----------------
+@app.get("/movie-summary")
+def get_movie_summary(
+    request: Request,
+    fields: str | None = None,
+    nested: bool = True,
+    limit: int | None = Query(None, ge=1, le=1000),
+    cursor: str | None = None,
+    since: int | None = None,
+    date: int | None = Query(None, ge=19000101, le=99991231),
+):
+    """Serve processed data.json (date=YYYYMMDD: that date of a multi-date sweep)
+
+    fields=gross,shows keeps only those fields per movie, nested=false drops
+    details/Chain_details, limit/cursor page through movies by gross.
+    since=<version> returns only what changed after that published version
+    (the current version is in the X-Snapshot-Version header).
+    """
+    snapshot = published_snapshot(date)
+    if since is not None:
+        return query_response(snapshot, request, snapshot.delta(since))
+
+    return summary_response(snapshot, request, fields, nested, limit, cursor)
+
+
+@app.get("/raw-movie-summary")
+def get_raw_movie_summary(
+    request: Request,
+    fields: str | None = None,
+    nested: bool = True,
+    limit: int | None = Query(None, ge=1, le=1000),
+    cursor: str | None = None,
+):
+    """Serve raw movie_summary.json file (same options as /movie-summary)"""
+    snapshot = raw_data_cache.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="movie_summary.json not found")
+
+    return summary_response(snapshot, request, fields, nested, limit, cursor)
+
+
+@app.get("/movies")
+def get_movies(
+    request: Request,
+    state: str | None = None,
+    top: int = Query(20, ge=1, le=1000),
+):
+    """Top movies by gross, overall or within a state (totals only)"""
+    snapshot = published_snapshot()
+    return query_response(snapshot, request, snapshot.index.top(top, state))
+
+
+@app.get("/movies/{title:path}")
+def get_movie(request: Request, title: str):
+    """One movie by full key, or every format/language of a base title"""
+    snapshot = published_snapshot()
+    movies = snapshot.index.movies(title)
+    if not movies:
+        raise HTTPException(status_code=404, detail=f"Movie '{title}' not found")
+
+    return query_response(snapshot, request, movies)
+
+
+@app.get("/cities/{city}")
+def get_city(
+    request: Request,
+    city: str,
+    state: str | None = None,
+    top: int | None = Query(None, ge=1, le=1000),
+):
+    """Movies playing in a city with their city-level numbers"""
+    snapshot = published_snapshot()
+    rows = snapshot.index.city(city, state, top)
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"City '{city}' not found")
+
+    return query_response(snapshot, request, rows)
+
+
+@app.get("/movie-summary/stream")
+async def stream_movie_summary(request: Request):
+    """Server-Sent Events: per-movie updates while a scrape is running"""
+    queue = live_feed.subscribe()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    break
+                event, data = message
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            live_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/movie-summary")
+async def websocket_movie_summary(websocket: WebSocket):
+    """WebSocket variant of /movie-summary/stream"""
+    await websocket.accept()
+    queue = live_feed.subscribe()
+    try:
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            event, data = message
+            await websocket.send_text(f'{{"event":"{event}","data":{data}}}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_feed.unsubscribe(queue)
@@ -0,0 +1,134 @@
+import os
+import json
+import asyncio
+
+COALESCE_WINDOW = 1.0  # seconds of venue updates merged into one push
+SUBSCRIBER_BACKLOG = 64  # pushes a slow client may fall behind before it is dropped
+
+
+# ---------------- COALESCING ----------------
+def coalesce(records):
+    """Merge several live_updates.jsonl records into one update.
+
+    Records carry current (not incremental) numbers, so the newest value
+    of each movie / city block / chain block wins.
+    """
+    movies = {}
+    blocks = {}  # movie -> (city blocks by (city, state), chain blocks by chain)
+    venues = set()
+    for record in records:
+        venues.update(record.get("venues", []))
+        for movie, stats in record.get("movies", {}).items():
+            merged = movies.setdefault(movie, {})
+            for k, v in stats.items():
+                if k not in ("details", "Chain_details"):
+                    merged[k] = v
+            cities, chains = blocks.setdefault(movie, ({}, {}))
+            for block in stats.get("details", []):
+                cities[(block["city"], block["state"])] = block
+            for block in stats.get("Chain_details", []):
+                chains[block["chain"]] = block
+
+    for movie, (cities, chains) in blocks.items():
+        movies[movie]["details"] = list(cities.values())
+        movies[movie]["Chain_details"] = list(chains.values())
+
+    last = records[-1]
+    return {
+        "seq": last.get("seq"),
+        "ts": last.get("ts"),
+        "date": last.get("date"),
+        "venues": sorted(venues),
+        "movies": movies,
+    }
+
+
+# ---------------- FEED ----------------
+class LiveFeed:
+    """Tail the scraper's live_updates.jsonl and fan it out to subscribers.
+
+    One background task reads the file every COALESCE_WINDOW seconds,
+    merges whatever arrived into a single update, encodes it once and hands
+    the same message to every subscriber queue. A new scraper run (file
+    truncated or replaced) is announced with a "reset" message.
+    """
+
+    def __init__(self, path, window=COALESCE_WINDOW):
+        self.path = path
+        self.window = window
+        self.subscribers = set()
+        self._inode = None
+        self._offset = 0
+        self._primed = False
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            try:
+                reset, records = await asyncio.to_thread(self._read_new)
+            except OSError as e:
+                print(f"⚠️ Live feed read failed: {e}")
+                continue
+
+            if reset:
+                self._publish(("reset", json.dumps({"reset": True})))
+            if records:
+                update = coalesce(records)
+                self._publish(("update", json.dumps(update, ensure_ascii=False)))
+
+    def _publish(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: end its stream, the client reconnects and refetches
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def _read_new(self):
+        """Return (reset, records) for complete lines written since the last read."""
+        primed, self._primed = self._primed, True
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False, []
+
+        if not primed:
+            # API (re)started mid-run: clients get the backlog from /raw-movie-summary
+            self._inode, self._offset = st.st_ino, st.st_size
+            return False, []
+
+        reset = False
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            reset = True
+            self._inode = st.st_ino
+            self._offset = 0
+
+        if st.st_size == self._offset:
+            return reset, []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(st.st_size - self._offset)
+
+        # Leave a partially written last line for the next read
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        self._offset += len(complete)
+
+        records = []
+        for line in complete.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return reset, records
@@ -0,0 +1,160 @@
+import sys
+
+
+# ---------------- INTERNED ATTRIBUTES ----------------
+class VenueInfo:
+    """Attributes shared by every show of a venue (one object per venue)."""
+
+    __slots__ = ("venue_code", "venue", "address", "city", "state", "chain")
+
+    def __init__(self, venue_code, venue, address, city, state, chain):
+        self.venue_code = venue_code
+        self.venue = venue
+        self.address = address
+        self.city = city
+        self.state = state
+        self.chain = chain
+
+    def __reduce__(self):
+        # Unpickled shows share the interned object again
+        return intern_venue, (
+            self.venue_code, self.venue, self.address, self.city, self.state, self.chain,
+        )
+
+
+def movie_name(title, dimension, language):
+    """Display name of a movie format: "Title [Dimension | Language]"."""
+    extra_info = " | ".join(part for part in (dimension, language) if part)
+    return f"{title} [{extra_info}]" if extra_info else title
+
+
+class MovieInfo:
+    """Attributes shared by every show of a movie format (one object each).
+
+    Aggregates are keyed by `key`; `movie` (the display name) is only
+    built from the fields, never parsed back.
+    """
+
+    __slots__ = ("movie", "title", "parent_event_code", "child_event_code", "dimension", "language")
+
+    def __init__(self, title, parent_event_code, child_event_code, dimension, language):
+        self.movie = movie_name(title, dimension, language)
+        self.title = title
+        self.parent_event_code = parent_event_code
+        self.child_event_code = child_event_code
+        self.dimension = dimension
+        self.language = language
+
+    @property
+    def key(self):
+        return (self.parent_event_code, self.child_event_code, self.dimension, self.language)
+
+    def __reduce__(self):
+        return intern_movie, (
+            self.title, self.parent_event_code, self.child_event_code, self.dimension, self.language,
+        )
+
+
+_venues = {}
+_movies = {}
+
+
+def intern_venue(*fields):
+    """The shared VenueInfo for these fields."""
+    info = _venues.get(fields)
+    if info is None:
+        info = _venues[fields] = VenueInfo(*fields)
+    return info
+
+
+def intern_movie(*fields):
+    """The shared MovieInfo for these fields."""
+    info = _movies.get(fields)
+    if info is None:
+        info = _movies[fields] = MovieInfo(*fields)
+    return info
+
+
+def intern_text(value):
+    """One shared copy of short, much repeated strings ("09:30 PM", "AUDI 1")."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# ---------------- SHOW ----------------
+class Show:
+    """One show: its own numbers plus references to the interned venue and
+    movie attributes. Converts to / from the show record dict for JSON
+    files.
+    """
+
+    __slots__ = (
+        "venue_info", "movie_info",
+        "time", "session_id", "audi",
+        "total", "sold", "available", "occupancy", "gross",
+    )
+
+    # Key order of the show record dict
+    FIELDS = (
+        "venue_code", "venue", "address", "city", "state", "chain",
+        "movie", "title", "parent_event_code", "child_event_code", "dimension", "language",
+        "time", "session_id", "audi",
+        "total", "sold", "available", "occupancy", "gross",
+    )
+
+    def __init__(self, venue_info, movie_info, time, session_id, audi,
+                 total, sold, available, occupancy, gross):
+        self.venue_info = venue_info
+        self.movie_info = movie_info
+        self.time = time
+        self.session_id = session_id
+        self.audi = audi
+        self.total = total
+        self.sold = sold
+        self.available = available
+        self.occupancy = occupancy
+        self.gross = gross
+
+    venue_code = property(lambda self: self.venue_info.venue_code)
+    venue = property(lambda self: self.venue_info.venue)
+    address = property(lambda self: self.venue_info.address)
+    city = property(lambda self: self.venue_info.city)
+    state = property(lambda self: self.venue_info.state)
+    chain = property(lambda self: self.venue_info.chain)
+    movie = property(lambda self: self.movie_info.movie)
+    title = property(lambda self: self.movie_info.title)
+    parent_event_code = property(lambda self: self.movie_info.parent_event_code)
+    child_event_code = property(lambda self: self.movie_info.child_event_code)
+    dimension = property(lambda self: self.movie_info.dimension)
+    language = property(lambda self: self.movie_info.language)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            intern_venue(d["venue_code"], d["venue"], d["address"], d["city"], d["state"], d["chain"]),
+            intern_movie(d["title"], d["parent_event_code"], d["child_event_code"], d["dimension"], d["language"]),
+            intern_text(d["time"]), d["session_id"], intern_text(d["audi"]),
+            d["total"], d["sold"], d["available"], d["occupancy"], d["gross"],
+        )
+
+
+def group_shows(shows):
+    """{MovieInfo.key: [Show]}: the shows_by_movie layout used everywhere."""
+    shows_by_movie = {}
+    for show in shows:
+        shows_by_movie.setdefault(show.movie_info.key, []).append(show)
+    return shows_by_movie
+
+
+def shows_from_json(records):
+    """[show record dicts] as loaded from JSON -> {MovieInfo.key: [Show]}."""
+    return group_shows(Show.from_dict(d) for d in records)
+
+
+def encode_show(obj):
+    """json.dump(default=...) hook writing Show objects as record dicts."""
+    if isinstance(obj, Show):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,49 @@
+import os
+import gzip
+import hashlib
+
+GZIP_LEVEL = 6
+
+
+# ---------------- RESPONSE CACHE ----------------
+class ResponseCache:
+    """Raw showtimes-by-venue responses on disk, gzip-compressed and keyed
+    by date, venue and content hash:
+
+        <root>/<date>/<venue>/<sha256>.json.gz
+
+    Only the latest response of each (date, venue) is kept. It is what
+    `python Main.py --reparse` rebuilds the outputs from.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def put(self, date_code, venue_code, body):
+        """Store `body` (if it isn't there already); returns its hash."""
+        content_hash = hashlib.sha256(body).hexdigest()
+        directory = os.path.join(self.root, str(date_code), venue_code)
+        path = os.path.join(directory, content_hash + ".json.gz")
+        if os.path.exists(path):
+            return content_hash
+
+        os.makedirs(directory, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(gzip.compress(body, GZIP_LEVEL))
+        os.replace(path + ".tmp", path)
+        for name in os.listdir(directory):
+            if name != content_hash + ".json.gz":
+                os.remove(os.path.join(directory, name))
+        return content_hash
+
+    def items(self, date_code):
+        """(venue_code, raw body) of every cached response of a date."""
+        root = os.path.join(self.root, str(date_code))
+        if not os.path.isdir(root):
+            return
+        for venue_code in sorted(os.listdir(root)):
+            directory = os.path.join(root, venue_code)
+            for name in os.listdir(directory):
+                if name.endswith(".json.gz"):
+                    with open(os.path.join(directory, name), "rb") as f:
+                        yield venue_code, gzip.decompress(f.read())
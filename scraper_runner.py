@@ -1,43 +1,123 @@
 import os
+import glob
 import json
 import time
+import shutil
 import subprocess
-from datetime import datetime
+from datetime import datetime, timezone
+from snapshot import dated_path, publish_snapshot
 
 # ---------------- CONFIG ----------------
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 SCRAPER_SCRIPT = os.path.join(BASE_PATH, "Main.py")
 DATA_PATH = os.path.join(BASE_PATH, "data.json")
+DATA_META_PATH = os.path.join(BASE_PATH, "data_meta.json")
+SNAPSHOT_HISTORY_PATH = os.path.join(BASE_PATH, "snapshot_history.json")
 MOVIE_SUMMARY_PATH = os.path.join(BASE_PATH, "movie_summary.json")
+SWEEP_DATES_PATH = os.path.join(BASE_PATH, "sweep_dates.json")
+# Dates for Main.py, e.g. "20251002-20251005" or "20251002 20251003" (default: its own)
+SCRAPER_DATES = os.environ.get("SCRAPER_DATES", "").split()
+# Venues are split across this many Main.py workers (see coordinator.py)
+SCRAPER_SHARDS = int(os.environ.get("SCRAPER_SHARDS", 1))
+COORDINATOR_SCRIPT = os.path.join(BASE_PATH, "coordinator.py")
+# Per-run files, relative to the directory a scraper runs in
 TEMP_FILES = [
-    os.path.join(BASE_PATH, "movie_summary.json"),
-    os.path.join(BASE_PATH, "fetchedvenues.json"),
-    os.path.join(BASE_PATH, "processed_venues.json")
+    "movie_summary.json",
+    "fetchedvenues.json",
+    "processed_venues.json",
+    "live_updates.jsonl",
+    "venue_journal.jsonl",
+    "sweep_dates.json",
 ]
+# Progress files of the non-primary dates of a multi-date sweep
+TEMP_PATTERNS = [
+    "movie_summary_*.json",
+    "fetchedvenues_*.json",
+    "processed_venues_*.json",
+]
+# Show-level Parquet dataset (shows/date=<d>/event=<e>/), rebuilt by every run
+SHOWS_DIR = "shows"
+# Exists while a run hasn't published yet; if it is still there when the
+# next run starts, Main.py crashed (or the runner was killed) and its
+# progress files and journal are resumed instead of cleaned
+RUN_MARKER_PATH = os.path.join(BASE_PATH, "scrape_in_progress")
 
-SCRAPER_INTERVAL = 60 * 60  # 1 hour
+# Each run only fetches venues whose refresh tier is due (see
+# venue_schedule.py), so runs are frequent and the hot tier sets the pace
+SCRAPER_INTERVAL = 5 * 60  # 5 minutes
 
 # ---------------- FUNCTIONS ----------------
-def clean_temp_files():
-    for file in TEMP_FILES:
+def clean_temp_files(base_path=BASE_PATH):
+    files = [os.path.join(base_path, f) for f in TEMP_FILES]
+    files += [f for p in TEMP_PATTERNS for f in glob.glob(os.path.join(base_path, p))]
+    for file in files:
         if os.path.exists(file):
             os.remove(file)
             print(f"🗑 Removed: {file}")
+    shows_dir = os.path.join(base_path, SHOWS_DIR)
+    if os.path.isdir(shows_dir):
+        shutil.rmtree(shows_dir)
+        print(f"🗑 Removed: {shows_dir}")
+
+def publish(summary_path, data_path, meta_path, history_path, scraped_at):
+    if not os.path.exists(summary_path):
+        return
+    with open(summary_path, "r", encoding="utf-8") as f:
+        movie_summary = json.load(f)
+    # History + metadata go first, so the API sees the new
+    # version as soon as the new data.json appears
+    version = publish_snapshot(
+        movie_summary, data_path, meta_path, history_path, scraped_at,
+    )
+    print(f"✅ Movie summary saved to {data_path} (version {version})")
+
+
+def run_once():
+    """One scrape + publish of every date of the sweep."""
+    print(f"🚀 Running scraper at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    resume = os.path.exists(RUN_MARKER_PATH)
+    if resume:
+        print("♻️ Last run did not publish: resuming its progress and journal")
+    else:
+        clean_temp_files()
+        open(RUN_MARKER_PATH, "w").close()
+    try:
+        if SCRAPER_SHARDS > 1:
+            subprocess.run(
+                ["python", COORDINATOR_SCRIPT, "--shards", str(SCRAPER_SHARDS),
+                 *(["--resume"] if resume else []), *SCRAPER_DATES],
+                check=True,
+            )
+        else:
+            subprocess.run(["python", SCRAPER_SCRIPT, *SCRAPER_DATES], check=True)
+        scraped_at = datetime.now(timezone.utc)
+        publish(MOVIE_SUMMARY_PATH, DATA_PATH, DATA_META_PATH,
+                SNAPSHOT_HISTORY_PATH, scraped_at)
+
+        # Every date of the sweep also gets its own data_<date>.json
+        # (served by /movie-summary?date=), all with the same scraped_at
+        dates = []
+        if os.path.exists(SWEEP_DATES_PATH):
+            with open(SWEEP_DATES_PATH, "r", encoding="utf-8") as f:
+                dates = json.load(f)
+        for i, date_code in enumerate(dates):
+            summary_path = MOVIE_SUMMARY_PATH if i == 0 else dated_path(MOVIE_SUMMARY_PATH, date_code)
+            publish(
+                summary_path,
+                dated_path(DATA_PATH, date_code),
+                dated_path(DATA_META_PATH, date_code),
+                dated_path(SNAPSHOT_HISTORY_PATH, date_code),
+                scraped_at,
+            )
+        # Published: the next run starts from clean per-run files
+        os.remove(RUN_MARKER_PATH)
+    except Exception as e:
+        print(f"⚠️ Scraper failed: {e}")
+
 
 def run_scraper():
     while True:
-        print(f"🚀 Running scraper at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        clean_temp_files()
-        try:
-            subprocess.run(["python", SCRAPER_SCRIPT], check=True)
-            if os.path.exists(MOVIE_SUMMARY_PATH):
-                with open(MOVIE_SUMMARY_PATH, "r", encoding="utf-8") as f:
-                    movie_summary = json.load(f)
-                with open(DATA_PATH, "w", encoding="utf-8") as f:
-                    json.dump(movie_summary, f, indent=2, ensure_ascii=False)
-                print(f"✅ Movie summary saved to {DATA_PATH}")
-        except Exception as e:
-            print(f"⚠️ Scraper failed: {e}")
+        run_once()
         print(f"⏱ Waiting {SCRAPER_INTERVAL / 60} minutes before next run...")
         time.sleep(SCRAPER_INTERVAL)
 
@@ -0,0 +1,106 @@
+import os
+import shutil
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ---------------- SCHEMA ----------------
+# Column types of a show record (see parse_showtimes in Main.py)
+SHOW_SCHEMA = pa.schema([
+    ("venue_code", pa.string()),
+    ("venue", pa.string()),
+    ("address", pa.string()),
+    ("city", pa.string()),
+    ("state", pa.string()),
+    ("chain", pa.string()),
+    ("movie", pa.string()),
+    ("title", pa.string()),
+    ("parent_event_code", pa.string()),
+    ("child_event_code", pa.string()),
+    ("dimension", pa.string()),
+    ("language", pa.string()),
+    ("time", pa.string()),
+    ("session_id", pa.string()),
+    ("audi", pa.string()),
+    ("total", pa.int64()),
+    ("sold", pa.int64()),
+    ("available", pa.int64()),
+    ("occupancy", pa.float64()),
+    ("gross", pa.float64()),
+])
+
+
+def partition_dir(root, date_code, event_code):
+    """shows/date=<date>/event=<event>: one hive partition per date and event."""
+    return os.path.join(root, f"date={date_code}", f"event={event_code}")
+
+
+# ---------------- WRITE ----------------
+def shows_table(shows):
+    """Column-wise Arrow table of show records."""
+    columns = {}
+    for field in SHOW_SCHEMA:
+        values = [getattr(show, field.name) for show in shows]
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        columns[field.name] = pa.array(values, type=field.type)
+    return pa.table(columns, schema=SHOW_SCHEMA)
+
+
+def append_shows(root, date_code, event_code, shows):
+    """Write `shows` as a new Parquet file in their partition."""
+    if not shows:
+        return None
+    directory = partition_dir(root, date_code, event_code)
+    os.makedirs(directory, exist_ok=True)
+    parts = sum(name.endswith(".parquet") for name in os.listdir(directory))
+    path = os.path.join(directory, f"part-{parts:05d}.parquet")
+    # Dot-prefixed while being written, so readers skip it
+    tmp = os.path.join(directory, f".part-{parts:05d}.parquet.tmp")
+    pq.write_table(shows_table(shows), tmp, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+def merge_parts(root, date_code):
+    """Rewrite every partition of a date into a single part file (the
+    appends of each compaction leave one small file per partition).
+    Returns how many files were merged away."""
+    merged = 0
+    date_dir = os.path.join(root, f"date={date_code}")
+    if not os.path.isdir(date_dir):
+        return merged
+    for name in sorted(os.listdir(date_dir)):
+        directory = os.path.join(date_dir, name)
+        parts = sorted(p for p in os.listdir(directory) if p.endswith(".parquet"))
+        if len(parts) < 2:
+            continue
+        table = pa.concat_tables(
+            [pq.read_table(os.path.join(directory, p), schema=SHOW_SCHEMA) for p in parts]
+        )
+        tmp = os.path.join(directory, ".merged.parquet.tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        for part in parts:
+            os.remove(os.path.join(directory, part))
+        os.replace(tmp, os.path.join(directory, "part-00000.parquet"))
+        merged += len(parts) - 1
+    return merged
+
+
+def clear_date(root, date_code):
+    """Drop every partition of a date (before rebuilding it)."""
+    shutil.rmtree(os.path.join(root, f"date={date_code}"), ignore_errors=True)
+
+
+# ---------------- READ ----------------
+def read_shows(root, date_code, event_code, columns=None):
+    """Load one partition as an Arrow table, reading only `columns`."""
+    dataset = ds.dataset(partition_dir(root, date_code, event_code), format="parquet")
+    return dataset.to_table(columns=columns)
+
+
+def latest_date(root):
+    """Most recent date=<date> partition under `root`."""
+    return max(
+        name.split("=", 1)[1] for name in os.listdir(root) if name.startswith("date=")
+    )
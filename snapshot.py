@@ -0,0 +1,540 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import defaultdict
+from functools import cached_property
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from box_office import BoxOfficeStats
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 9
+SNAPSHOT_HISTORY = 48  # published versions a client can ask ?since= about
+BROTLI_QUALITY = 11  # max ratio; slow, so snapshots are rebuilt off the request path
+
+
+# ---------------- SNAPSHOT ----------------
+class Snapshot:
+    """One parsed version of a summary file plus its encoded response body.
+
+    `etag` is a hash of the file content and `last_updated` is the time
+    the scrape that produced it finished, so both stay stable across
+    requests and API restarts.
+
+    gzip (and brotli, if installed) variants of the body are built once
+    here, so serving a compressed response costs nothing per request.
+
+    Every movie entry is also encoded once, with and without its nested
+    `details` / `Chain_details`, so projected and paginated views are
+    assembled from ready-made bytes. The "totals only" document
+    (nested=false) is kept fully encoded and compressed like the full one.
+    """
+
+    def __init__(self, data, raw, last_updated, brotli_quality=BROTLI_QUALITY,
+                 version=None, history=None):
+        self.data = data
+        self.version = version
+        self.history = history or {}  # earlier version -> movie_digests()
+        self._deltas = {}
+        self.last_updated = last_updated.astimezone(timezone.utc).replace(microsecond=0)
+        self.content_hash = hashlib.sha256(raw).hexdigest()[:32]
+        self.etag = f'"{self.content_hash}"'
+        self.body_last_updated = last_updated.astimezone().strftime("%d/%m/%Y, %I:%M:%S %p")
+        self.index = SummaryIndex(data)
+
+        # movie -> (encoded key, full entry, entry without nested arrays)
+        self.fragments = {
+            movie: (
+                encode_json(movie),
+                encode_json(entry),
+                encode_json(strip_nested(entry)),
+            )
+            for movie, entry in data.items()
+        }
+        self.body = self._assemble(data, nested=True)
+        self.variants = compress_variants(self.body, brotli_quality)
+        self.totals_body = self._assemble(data, nested=False)
+        self.totals_variants = compress_variants(self.totals_body, brotli_quality)
+
+    def encoded(self, accept_encoding=None, nested=True):
+        """Pick the best precompressed body for an Accept-Encoding header.
+
+        Returns (content_encoding, body, etag); content_encoding is None
+        for the uncompressed body.
+        """
+        body, variants = (
+            (self.body, self.variants) if nested else (self.totals_body, self.totals_variants)
+        )
+        encoding = negotiate_encoding(accept_encoding, variants)
+        if encoding is None:
+            return None, body, self.etag
+        return encoding, variants[encoding], f'"{self.content_hash}-{encoding}"'
+
+    def projection(self, fields=None, nested=True, limit=None, cursor=None):
+        """Encode a projected and/or paginated view of the summary.
+
+        Movies are ordered by gross (highest first). `fields` keeps only the
+        listed entry fields; `cursor` is the `next_cursor` of a previous
+        page and is rejected with ValueError once the snapshot has changed.
+        """
+        start = 0
+        if cursor:
+            snapshot_id, _, offset = cursor.partition(":")
+            if snapshot_id != self.content_hash[:12] or not offset.isdigit():
+                raise ValueError("Invalid or expired cursor")
+            start = int(offset)
+
+        movies = self.index.by_gross[start:start + limit if limit else None]
+        end = start + len(movies)
+        next_cursor = (
+            f"{self.content_hash[:12]}:{end}" if end < len(self.index.by_gross) else None
+        )
+
+        if fields:
+            wanted = [f for f in fields if nested or f not in NESTED_FIELDS]
+            items = (
+                encode_json(movie) + b":"
+                + encode_json({f: self.data[movie][f] for f in wanted if f in self.data[movie]})
+                for movie in movies
+            )
+        else:
+            items = self._items(movies, nested)
+
+        return (
+            b'{"last_updated":' + encode_json(self.body_last_updated)
+            + b',"data":{' + b",".join(items)
+            + b'},"next_cursor":' + encode_json(next_cursor) + b"}"
+        )
+
+    def _items(self, movies, nested):
+        return (
+            self.fragments[movie][0] + b":" + self.fragments[movie][1 if nested else 2]
+            for movie in movies
+        )
+
+    def _assemble(self, movies, nested):
+        return (
+            b'{"last_updated":' + encode_json(self.body_last_updated)
+            + b',"data":{' + b",".join(self._items(movies, nested)) + b"}}"
+        )
+
+    def delta(self, since):
+        """Movies (and city / chain blocks) that changed since version `since`.
+
+        Changed movies carry their current totals plus only the changed
+        blocks; dropped blocks are listed under `removed_details` /
+        `removed_chains`. If `since` is unknown (too old, or from before
+        versioning) the whole summary is returned with "full": true.
+        """
+        if since in self._deltas:
+            return self._deltas[since]
+
+        old = self.history.get(since)
+        if since != self.version and old is None:
+            return {"version": self.version, "since": since, "full": True,
+                    "changed": self.data, "removed": []}
+
+        changed = {}
+        if since != self.version:
+            for movie, digests in self.digests.items():
+                before = old.get(movie)
+                if before is None:
+                    changed[movie] = self.data[movie]
+                elif before != digests:
+                    changed[movie] = movie_changes(self.data[movie], digests, before)
+
+        self._deltas[since] = {
+            "version": self.version,
+            "since": since,
+            "full": False,
+            "changed": changed,
+            "removed": sorted(set(old or ()) - set(self.data)),
+        }
+        return self._deltas[since]
+
+    @cached_property
+    def digests(self):
+        return movie_digests(self.data)
+
+    def headers(self, etag=None):
+        headers = {
+            "ETag": etag or self.etag,
+            "Last-Modified": format_datetime(self.last_updated, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self.version is not None:
+            headers["X-Snapshot-Version"] = str(self.version)
+        return headers
+
+    def is_not_modified(self, if_none_match=None, if_modified_since=None):
+        """Evaluate conditional GET headers (If-None-Match wins, per RFC 9110).
+
+        Any encoding variant's ETag matches, since they share one content hash.
+        """
+        if if_none_match:
+            tags = [t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")]
+            return "*" in tags or any(
+                t.split("-")[0] == self.content_hash for t in tags
+            )
+
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_updated <= since
+
+        return False
+
+
+def encode_json(payload):
+    """Encode a payload the same way JSONResponse does."""
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compress_variants(body, brotli_quality=BROTLI_QUALITY):
+    """Build every compressed encoding we can serve for a body."""
+    variants = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=brotli_quality)
+    return variants
+
+
+def negotiate_encoding(accept_encoding, variants):
+    """Return the preferred encoding in `variants` the client accepts, or None."""
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    # Prefer brotli over gzip when the client rates them equally
+    for encoding in ("br", "gzip"):
+        if encoding not in variants:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+# ---------------- VERSIONS ----------------
+def digest(value):
+    return hashlib.sha1(encode_json(value)).hexdigest()[:16]
+
+
+def city_key(block):
+    return f"{block['city']}|{block['state']}"
+
+
+def movie_digests(data):
+    """Per-movie content hashes used to diff two published snapshots.
+
+    movie -> {"totals": hash, "details": {"city|state": hash},
+              "Chain_details": {chain: hash}}
+    """
+    return {
+        movie: {
+            "totals": digest(strip_nested(entry)),
+            "details": {city_key(b): digest(b) for b in entry.get("details", [])},
+            "Chain_details": {b["chain"]: digest(b) for b in entry.get("Chain_details", [])},
+        }
+        for movie, entry in data.items()
+    }
+
+
+def movie_changes(entry, digests, before):
+    """Current totals of a movie plus only the blocks that differ from `before`."""
+    changes = strip_nested(entry)
+    changes["details"] = [
+        b for b in entry.get("details", [])
+        if before["details"].get(city_key(b)) != digests["details"][city_key(b)]
+    ]
+    changes["Chain_details"] = [
+        b for b in entry.get("Chain_details", [])
+        if before["Chain_details"].get(b["chain"]) != digests["Chain_details"][b["chain"]]
+    ]
+
+    removed_details = sorted(set(before["details"]) - set(digests["details"]))
+    if removed_details:
+        changes["removed_details"] = [
+            dict(zip(("city", "state"), key.split("|", 1))) for key in removed_details
+        ]
+    removed_chains = sorted(set(before["Chain_details"]) - set(digests["Chain_details"]))
+    if removed_chains:
+        changes["removed_chains"] = removed_chains
+    return changes
+
+
+# ---------------- INDEX ----------------
+NESTED_FIELDS = ("details", "Chain_details")
+
+
+def strip_nested(entry):
+    """A summary entry without its per-city / per-chain breakdowns."""
+    return {k: v for k, v in entry.items() if k not in NESTED_FIELDS}
+
+
+def movie_totals(movie, entry):
+    """Top-level numbers of a summary entry, tagged with the movie key."""
+    return {"movie": movie, **strip_nested(entry)}
+
+
+class SummaryIndex:
+    """Lookup tables over a movie summary, built once per snapshot.
+
+    - by_gross: movie keys, highest gross first
+    - by_title: lowercased full key or title (entry["title"]) -> movie keys
+    - by_state: lowercased state -> per-movie state totals, highest gross first
+    - by_city: lowercased city -> per-movie city blocks, highest gross first
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.by_gross = sorted(data, key=lambda m: data[m].get("gross", 0), reverse=True)
+        self.by_title = defaultdict(list)
+        self.by_state = defaultdict(list)
+        self.by_city = defaultdict(list)
+
+        for movie in self.by_gross:
+            entry = data[movie]
+            self.by_title[movie.lower()].append(movie)
+            title = entry.get("title", movie).lower()
+            if title != movie.lower():
+                self.by_title[title].append(movie)
+
+            states = {}  # state -> (cities, BoxOfficeStats)
+            for block in entry.get("details", []):
+                self.by_city[block["city"].lower()].append({"movie": movie, **block})
+
+                cities, stats = states.get(block["state"], (0, BoxOfficeStats()))
+                states[block["state"]] = (cities + 1, stats.merge(BoxOfficeStats.from_dict(block)))
+
+            for state, (cities, stats) in states.items():
+                self.by_state[state.lower()].append(
+                    {"movie": movie, "state": state, "cities": cities, **stats.to_dict()}
+                )
+
+        for rows in (*self.by_state.values(), *self.by_city.values()):
+            rows.sort(key=lambda r: r["gross"], reverse=True)
+
+    def movies(self, title):
+        """Full entries for an exact movie key, or every variant of a title."""
+        return {m: self.data[m] for m in self.by_title.get(title.strip().lower(), [])}
+
+    def top(self, top, state=None):
+        """Top movies by gross, overall or within one state."""
+        if state is not None:
+            return self.by_state.get(state.strip().lower(), [])[:top]
+        return [movie_totals(m, self.data[m]) for m in self.by_gross[:top]]
+
+    def city(self, city, state=None, top=None):
+        """Per-movie blocks for a city, optionally restricted to one state."""
+        rows = self.by_city.get(city.strip().lower(), [])
+        if state is not None:
+            rows = [r for r in rows if r["state"].lower() == state.strip().lower()]
+        return rows[:top]
+
+
+# ---------------- CACHE ----------------
+class SnapshotCache:
+    """Hold the latest Snapshot of a JSON file in memory.
+
+    The file is re-read only when its inode/mtime/size changes or after
+    invalidate() is called. A hot request is a stat() plus handing out the
+    cached bytes.
+
+    Building a Snapshot (encoding + compressing every variant) takes
+    seconds on a big summary, so only the very first load happens inside
+    a request. Afterwards a changed file is rebuilt in a background thread
+    while requests keep getting the previous snapshot; the scraper calls
+    refresh() right after publishing, so that is usually done before any
+    request notices the change.
+
+    If `meta_path` points to a JSON file with a `scraped_at` ISO timestamp
+    (written by scraper_runner.py when it publishes), that is used as the
+    snapshot time; otherwise the file mtime is. Its `version` and the
+    digests of earlier versions in `history_path` enable Snapshot.delta().
+
+    `brotli_quality` can be lowered for files that change often (the raw
+    summary is rewritten after every venue while a scrape is running).
+    """
+
+    def __init__(self, path, meta_path=None, brotli_quality=BROTLI_QUALITY,
+                 history_path=None):
+        self.path = path
+        self.meta_path = meta_path
+        self.history_path = history_path
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        self._signature = None
+        self._snapshot = None
+        self._stale = True
+
+    def invalidate(self):
+        """Force a reload on the next get()."""
+        self._stale = True
+
+    def get(self):
+        """Return the current Snapshot, or None if the file does not exist."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if not self._stale and signature == self._signature:
+            return self._snapshot
+
+        if self._snapshot is None:
+            with self._lock:
+                self._refresh()
+            return self._snapshot
+
+        # Serve the previous snapshot while a background thread rebuilds it
+        # (the lock is handed to that thread, which releases it when done)
+        if self._lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh_and_release, daemon=True).start()
+        return self._snapshot
+
+    def refresh(self):
+        """Rebuild the snapshot now, in the calling thread, if the file
+        changed or invalidate() was called."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh_and_release(self):
+        try:
+            self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if self._stale or signature != self._signature:
+            self._reload(signature, st)
+
+    def _reload(self, signature, st):
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except (OSError, ValueError) as e:
+            # File is mid-write or gone; keep serving the previous snapshot
+            # and retry on the next request.
+            print(f"⚠️ Could not load {self.path}: {e}")
+            return
+
+        scraped_at, version = self._read_meta(st)
+        self._snapshot = Snapshot(
+            data, raw, scraped_at, self.brotli_quality, version, self._read_history()
+        )
+        self._signature = signature
+        self._stale = False
+
+    def _read_meta(self, st):
+        if self.meta_path and os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                scraped_at = datetime.fromisoformat(meta["scraped_at"])
+                if scraped_at.tzinfo is None:
+                    scraped_at = scraped_at.astimezone()
+                return scraped_at, meta.get("version")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Bad snapshot metadata {self.meta_path}: {e}")
+
+        return datetime.fromtimestamp(st.st_mtime, timezone.utc), None
+
+    def _read_history(self):
+        if not (self.history_path and os.path.exists(self.history_path)):
+            return {}
+        try:
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                return {h["version"]: h["digests"] for h in json.load(f)}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Bad snapshot history {self.history_path}: {e}")
+            return {}
+
+
+# ---------------- PUBLISHING ----------------
+def publish_snapshot(data, data_path, meta_path, history_path, scraped_at,
+                     keep=SNAPSHOT_HISTORY):
+    """Publish `data` as a new numbered snapshot.
+
+    Writes the digests of this version to `history_path` (keeping the last
+    `keep` versions), then the metadata, then the data file itself, each via
+    write + rename so the API only ever sees complete files.
+
+    If nothing changed since the last published version, nothing is
+    written and that version is returned, so unchanged runs neither use up
+    the history nor change the ETag.
+    """
+    version = 1
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                version = int(json.load(f).get("version") or 0) + 1
+        except (OSError, ValueError, TypeError):
+            pass
+
+    history = []
+    if os.path.exists(history_path):
+        try:
+            with open(history_path, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+    digests = movie_digests(data)
+    if (
+        history and history[-1].get("version") == version - 1
+        and history[-1].get("digests") == digests and os.path.exists(data_path)
+    ):
+        return version - 1
+    history.append({
+        "version": version,
+        "scraped_at": scraped_at.isoformat(),
+        "digests": digests,
+    })
+
+    write_json(history_path, history[-keep:])
+    write_json(meta_path, {"scraped_at": scraped_at.isoformat(), "version": version})
+    write_json(data_path, data, indent=2)
+    return version
+
+
+def write_json(path, payload, indent=None):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=indent, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def dated_path(path, date_code):
+    """data.json -> data_20251003.json: where a per-date file lives."""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{date_code}{ext}"
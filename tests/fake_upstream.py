@@ -0,0 +1,106 @@
+import sys
+import json
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# ---------------- PAYLOADS ----------------
+# (title, event group, [(dimension, language)]): one child event per format
+MOVIES = [
+    ("They Call Him OG", "EG00376057", [("2D", "Telugu"), ("2D", "Hindi"), ("IMAX 2D", "Telugu")]),
+    ("Kantara [Chapter 1]", "EG00400001", [("2D", "Kannada"), ("2D", "Telugu")]),
+    ("Idli Kadai", "EG00400002", [("2D", "Tamil")]),
+    ("Baaghi 4", "EG00400003", [("", "Hindi")]),
+]
+
+
+def payload(venue_code, date_code):
+    """Showtimes-by-venue response of a venue/date: made up, but always the
+    same for the same venue and date. Some venues have no shows."""
+    rnd = random.Random(hashlib.md5(f"{venue_code}{date_code}".encode()).hexdigest())
+    if rnd.random() < 0.2:
+        return {"ShowDetails": []}
+
+    events = []
+    for title, group, formats in MOVIES:
+        if rnd.random() < 0.4:
+            continue
+        children = []
+        for i, (dimension, language) in enumerate(formats):
+            if rnd.random() < 0.3:
+                continue
+            shows = []
+            for k in range(rnd.randint(1, 4)):
+                categories = []
+                for _ in range(rnd.randint(1, 3)):
+                    seats = rnd.randint(20, 200)
+                    categories.append({
+                        "MaxSeats": str(seats),
+                        "SeatsAvail": str(rnd.randint(0, seats)),
+                        "CurPrice": str(rnd.choice([100, 150, 200.5, 295])),
+                    })
+                shows.append({
+                    "ShowTime": f"{rnd.randint(9, 11):02d}:{rnd.choice(['00', '30'])} PM",
+                    "SessionId": f"{venue_code}{k}{i}",
+                    "Attributes": "AUDI 1",
+                    "Categories": categories,
+                })
+            children.append({
+                "EventDimension": dimension,
+                "EventLanguage": language,
+                "EventCode": f"ET{group[-4:]}{i}",
+                "ShowTimes": shows,
+            })
+        events.append({"EventTitle": title, "EventGroup": group, "ChildEvents": children})
+
+    return {"ShowDetails": [{
+        "Date": str(date_code),
+        "Venues": {"VenueName": f"Venue {venue_code}", "VenueAdd": f"Address {venue_code}"},
+        "Event": events,
+    }]}
+
+
+# ---------------- SERVER ----------------
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        if "venueCode" not in query:
+            return self.send(404, {})
+        self.send(200, payload(query["venueCode"][0], query["dateCode"][0]))
+
+    def send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@contextmanager
+def serve(port=0):
+    """Run the fake upstream in a thread; yields the URL for BMS_API_URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/api/v2/mobile/showtimes/byvenue"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# usage: python tests/fake_upstream.py [PORT], then
+#        BMS_API_URL=<printed url> python Main.py
+if __name__ == "__main__":
+    with serve(int(sys.argv[1]) if len(sys.argv) > 1 else 0) as url:
+        print(f"🧪 Fake showtimes API at {url}")
+        threading.Event().wait()
@@ -0,0 +1,114 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import subprocess
+
+import pyarrow.dataset as ds
+import pytest
+
+from fake_upstream import serve
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+from coordinator import assign_shards  # noqa: E402
+
+DATE_CODE = "20251002"
+STATES = {
+    "Andhra Pradesh": ["Vijayawada", "Guntur"],
+    "Telangana": ["Hyderabad"],
+    "Karnataka": ["Bengaluru", "Mysuru"],
+    "Tamil Nadu": ["Chennai"],
+    "Maharashtra": ["Mumbai", "Pune"],
+    "Kerala": ["Kochi"],
+}
+
+
+def make_venues():
+    venues = {}
+    for s, (state, cities) in enumerate(STATES.items()):
+        for v in range(4 + s % 3):
+            code = f"V{s}{v:02d}"
+            venues[code] = {
+                "VenueCode": code,
+                "VenueName": f"Venue {code}",
+                "City": cities[v % len(cities)],
+                "State": state,
+                "RegionCode": cities[v % len(cities)][:4].upper(),
+                "VenueCompName": ["PVR", "INOX", "Cinepolis"][v % 3],
+            }
+    return venues
+
+
+def checkout(path, venues):
+    """A copy of the scripts with its own venues.json (outputs land next to it)."""
+    os.makedirs(path)
+    for script in glob.glob(os.path.join(REPO, "*.py")):
+        shutil.copy(script, path)
+    with open(os.path.join(path, "venues.json"), "w", encoding="utf-8") as f:
+        json.dump(venues, f)
+    return path
+
+
+def run(path, url, *args):
+    env = {**os.environ, "BMS_API_URL": url, "BMS_TRACKED_EVENTS": "all"}
+    subprocess.run(
+        [sys.executable, *args], cwd=path, env=env, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, timeout=300,
+    )
+
+
+def normalized(value):
+    """Summary with floats rounded and lists in a fixed order, so sums
+    added up in another order compare equal."""
+    if isinstance(value, dict):
+        return {k: normalized(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return sorted((normalized(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def movie_summary(path):
+    with open(os.path.join(path, "movie_summary.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def shows(path):
+    table = ds.dataset(os.path.join(path, "shows"), format="parquet", partitioning="hive").to_table()
+    return sorted(
+        (row["venue_code"], row["session_id"], row["child_event_code"], row["sold"], row["gross"])
+        for row in table.select(["venue_code", "session_id", "child_event_code", "sold", "gross"]).to_pylist()
+    )
+
+
+def test_assign_shards_keeps_states_together():
+    venues = make_venues()
+    parts = assign_shards(venues, 3)
+    assert sorted(v for part in parts for v in part) == sorted(venues)
+    for part in parts:
+        for state in {info["State"] for info in part.values()}:
+            assert all(
+                code in part for code, info in venues.items() if info["State"] == state
+            )
+    sizes = [len(part) for part in parts]
+    assert max(sizes) - min(sizes) <= max(len(c) for c in STATES.values()) + 4
+
+
+@pytest.mark.parametrize("shards", [2, 3])
+def test_sharded_sweep_matches_single_sweep(tmp_path, shards):
+    venues = make_venues()
+    single = checkout(str(tmp_path / "single"), venues)
+    sharded = checkout(str(tmp_path / "sharded"), venues)
+
+    with serve() as url:
+        run(single, url, "Main.py", DATE_CODE)
+        run(sharded, url, "coordinator.py", "--shards", str(shards), DATE_CODE)
+
+    expected = movie_summary(single)
+    assert expected, "the fake upstream should have produced shows"
+    assert normalized(movie_summary(sharded)) == normalized(expected)
+    assert shows(sharded) == shows(single)
+    assert len(glob.glob(os.path.join(sharded, "shards", "shard-*"))) == shards
@@ -1,9 +1,15 @@
-import ijson
+import sys
 import pandas as pd
 from tabulate import tabulate
+from box_office import BoxOfficeStats, group_stats
+from show_store import latest_date, read_shows
 
-file_path = "all_shows.json"
-filtered_rows = []
+# Show-level Parquet dataset written by Main.py: shows/date=<date>/event=<event>/
+# usage: python total.py [EVENT_CODE] [DATE_CODE]  (default: latest date)
+SHOWS_DIR = "shows"
+COLUMNS = ["venue", "city", "state", "language", "total", "sold", "gross"]
+event_code = sys.argv[1] if len(sys.argv) > 1 else "EG00376057"
+date_code = sys.argv[2] if len(sys.argv) > 2 else latest_date(SHOWS_DIR)
 
 # Function to format numbers in Indian style (Cr, Lakh, Thousand)
 def format_indian_number(num):
@@ -17,70 +23,45 @@ def format_indian_number(num):
     else:
         return f"{num:.2f}"
 
-# Stream parse JSON
-with open(file_path, "r", encoding="utf-8") as f:
-    for item in ijson.items(f, "item"):
-        item["fastfilling"] = 1 if 50 <= item["occupancy"] < 98 else 0
-        item["housefull"] = 1 if item["occupancy"] >= 98 else 0
-        filtered_rows.append(item)
-
-df_filtered = pd.DataFrame(filtered_rows)
+# Read only the columns used below, already typed
+df_filtered = read_shows(SHOWS_DIR, date_code, event_code, COLUMNS).to_pandas()
 
 # Ensure numeric columns are correct
-numeric_cols = ["total", "sold", "gross", "occupancy", "fastfilling", "housefull"]
+numeric_cols = ["total", "sold", "gross"]
 for col in numeric_cols:
     df_filtered[col] = pd.to_numeric(df_filtered[col], errors="coerce").fillna(0)
 
 # ======================
-# Helper function
+# Helper functions
 # ======================
-def make_summary(df, group_col):
-    summary = df.groupby(group_col).agg(
-        totalShows=("venue", "count"),
-        totalGross=("gross", "sum"),
-        totalSold=("sold", "sum"),
-        totalSeats=("total", "sum"),
-        fastfilling=("fastfilling", "sum"),
-        housefull=("housefull", "sum"),
-        avgOccupancy=("occupancy", "mean")
-    ).reset_index()
-
-    # Grand total row
-    grand_total = pd.DataFrame({
-        group_col: ["Grand Total"],
-        "totalShows": [summary["totalShows"].sum()],
-        "totalGross": [summary["totalGross"].sum()],
-        "totalSold": [summary["totalSold"].sum()],
-        "totalSeats": [summary["totalSeats"].sum()],
-        "fastfilling": [summary["fastfilling"].sum()],
-        "housefull": [summary["housefull"].sum()],
-        "avgOccupancy": [
-            summary["totalSold"].sum() / summary["totalSeats"].sum() * 100 
-            if summary["totalSeats"].sum() > 0 else 0
-        ]
-    })
-
-    summary = pd.concat([summary, grand_total], ignore_index=True)
-
-    # Round avgOccupancy
-    summary["avgOccupancy"] = summary["avgOccupancy"].round(2).astype(str) + "%"
+def summary_row(labels, stats):
+    return {
+        **labels,
+        "totalShows": stats.shows,
+        "totalGross": format_indian_number(stats.gross),
+        "totalSold": f"{stats.sold:,.0f}",
+        "totalSeats": f"{stats.total_seats:,.0f}",
+        "fastfilling": stats.fastfilling,
+        "housefull": stats.housefull,
+        "avgOccupancy": f"{stats.occupancy}%",
+    }
 
-    # Save numeric gross for sorting
-    summary["_grossNum"] = summary["totalGross"]
 
-    # Format numbers
-    summary["totalGross"] = summary["_grossNum"].apply(format_indian_number)
-    summary["totalSold"] = summary["totalSold"].apply(lambda x: f"{x:,.0f}")
-    summary["totalSeats"] = summary["totalSeats"].apply(lambda x: f"{x:,.0f}")
-
-    # Sort by numeric gross (keeping grand total at bottom)
-    body = summary.iloc[:-1].sort_values(by="_grossNum", ascending=False)
-    summary = pd.concat([body, summary.iloc[[-1]]], ignore_index=True)
-
-    # Drop helper col
-    summary = summary.drop(columns=["_grossNum"])
-
-    return summary
+def make_summary(df, group_col):
+    groups = group_stats(df, group_col)
+
+    # Grand total row: the groups merged
+    grand_total = BoxOfficeStats()
+    for stats in groups.values():
+        grand_total.merge(stats)
+
+    # Sort by gross (keeping grand total at bottom)
+    rows = [
+        summary_row({group_col: key}, stats)
+        for key, stats in sorted(groups.items(), key=lambda g: g[1].gross, reverse=True)
+    ]
+    rows.append(summary_row({group_col: "Grand Total"}, grand_total))
+    return pd.DataFrame(rows)
 
 # ======================
 # Generate summaries
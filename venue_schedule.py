@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from box_office import BoxOfficeStats
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# ---------------- TIERS ----------------
+# Seconds between refreshes of a venue in each tier
+TIERS = {
+    "hot": 5 * 60,
+    "warm": 20 * 60,
+    "cool": 60 * 60,
+    "dormant": None,  # no shows: negative cache TTL, see negative_ttl()
+}
+# A venue is hot/warm if it has this many shows, or if its gross or
+# occupancy moved at least this much per hour since the last fetch
+HOT = {"shows": 20, "gross": 50000, "occupancy": 5.0}
+WARM = {"shows": 8, "gross": 5000, "occupancy": 1.0}
+
+# ---------------- NEGATIVE CACHE ----------------
+# A venue with no shows for a date is re-probed after NEGATIVE_TTL, doubling
+# with every further empty answer up to NEGATIVE_TTL_MAX. From RELEASE_WINDOW
+# days before the date on, when cinemas open bookings, the TTL is capped at
+# RELEASE_TTL so new shows are picked up quickly.
+NEGATIVE_TTL = 60 * 60
+NEGATIVE_TTL_MAX = 12 * 60 * 60
+RELEASE_WINDOW = 1  # days
+RELEASE_TTL = 30 * 60
+
+
+def negative_ttl(date_code, empty_probes, now):
+    """Seconds an empty (date, venue) answer stays valid."""
+    ttl = min(NEGATIVE_TTL * 2 ** max(empty_probes - 1, 0), NEGATIVE_TTL_MAX)
+    try:
+        target = datetime.strptime(str(date_code), "%Y%m%d").date()
+    except ValueError:
+        return ttl
+    if (target - datetime.fromtimestamp(now, IST).date()).days <= RELEASE_WINDOW:
+        ttl = min(ttl, RELEASE_TTL)
+    return ttl
+
+
+# ---------------- SHOW TIMES ----------------
+# Shows listed under a date but starting before this hour run past midnight
+LATE_NIGHT_CUTOFF = 6
+
+
+def show_start(date_code, show_time):
+    """Epoch of a show's start ("09:30 PM" on date_code, IST), or None."""
+    for fmt in ("%I:%M %p", "%H:%M"):
+        try:
+            start = datetime.strptime(f"{date_code} {show_time.strip()}", f"%Y%m%d {fmt}")
+        except (AttributeError, ValueError):
+            continue
+        if start.hour < LATE_NIGHT_CUTOFF:
+            start += timedelta(days=1)
+        return start.replace(tzinfo=IST).timestamp()
+    return None
+
+
+def last_show_start(date_code, shows_by_movie):
+    """Start of a venue's latest show, or None if it has none or any show
+    time can't be read (such a venue is never frozen)."""
+    starts = [
+        show_start(date_code, show.time)
+        for shows in shows_by_movie.values()
+        for show in shows
+    ]
+    if not starts or None in starts:
+        return None
+    return max(starts)
+
+
+def venue_activity(shows_by_movie):
+    """(shows, gross, occupancy %) of one venue's parsed shows."""
+    stats = BoxOfficeStats.of_shows(
+        show for movie_shows in shows_by_movie.values() for show in movie_shows
+    )
+    return stats.shows, stats.gross, stats.occupancy
+
+
+def assign_tier(shows, gross_rate, occupancy_rate):
+    """Tier from the show count and the hourly change of gross / occupancy."""
+    if not shows:
+        return "dormant"
+    for tier, limits in (("hot", HOT), ("warm", WARM)):
+        if (
+            shows >= limits["shows"]
+            or gross_rate >= limits["gross"]
+            or occupancy_rate >= limits["occupancy"]
+        ):
+            return tier
+    return "cool"
+
+
+# ---------------- SCHEDULE ----------------
+# Layout of the pickled shows; rows of an older layout are dropped (and
+# those venues refetched) instead of being unpickled
+SHOWS_LAYOUT = 2  # {MovieInfo.key: [Show]}
+
+
+class VenueSchedule:
+    """Refresh tier and last-known shows of every (date, venue), kept
+    across runs. The tiers live in one JSON file:
+
+        {date: {venue: {"fetched_at", "tier", "shows", "gross", "occupancy",
+                        "empty_probes", "last_show_at", "response_hash"}}}
+
+    and the shows (pickled {movie: [Show]}) in an SQLite file, read only
+    when a venue is carried forward, so they never all sit in memory.
+
+    A venue is due once its tier's interval has passed since it was last
+    fetched; until then its last shows stand in for a fresh fetch.
+    Venues without shows ("dormant") form the negative cache: their entry
+    also counts consecutive empty answers ("empty_probes") for the TTL.
+
+    Once a venue's last show has started its sold counts are final: it is
+    fetched once more after that start and then frozen for the date.
+    """
+
+    def __init__(self, path, shows_path, date_codes):
+        self.path = path
+        saved = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = {}
+        # Dates that are no longer swept are dropped
+        self.entries = {str(d): saved.get(str(d), {}) for d in date_codes}
+        for entries in self.entries.values():
+            # Entries of the older layout kept their shows inline: refetch those
+            for venue_code in [v for v, e in entries.items() if "movies" in e]:
+                del entries[venue_code]
+
+        self.db = sqlite3.connect(shows_path)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SHOWS_LAYOUT:
+            self.db.execute("DROP TABLE IF EXISTS last_shows")
+            self.db.execute(f"PRAGMA user_version = {SHOWS_LAYOUT}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS last_shows "
+            "(date TEXT, venue TEXT, movies BLOB, PRIMARY KEY (date, venue))"
+        )
+        self.db.execute(
+            f"DELETE FROM last_shows WHERE date NOT IN ({','.join('?' * len(self.entries))})",
+            list(self.entries),
+        )
+
+    def is_due(self, date_code, venue_code, now=None):
+        entry = self.entries[str(date_code)].get(venue_code)
+        if entry is None:
+            return True
+        now = time.time() if now is None else now
+        last_show_at = entry.get("last_show_at")
+        if last_show_at is not None:
+            if entry["fetched_at"] >= last_show_at:
+                return False  # frozen
+            if now >= last_show_at:
+                return True  # pick up the final numbers
+        if entry["tier"] == "dormant":
+            interval = negative_ttl(date_code, entry.get("empty_probes", 1), now)
+        else:
+            interval = TIERS.get(entry["tier"], 0)
+        return now - entry["fetched_at"] >= interval
+
+    def is_frozen(self, date_code, venue_code):
+        entry = self.entries[str(date_code)].get(venue_code)
+        return (
+            entry is not None
+            and entry.get("last_show_at") is not None
+            and entry["fetched_at"] >= entry["last_show_at"]
+        )
+
+    def last_shows(self, date_code, venue_code):
+        row = self.db.execute(
+            "SELECT movies FROM last_shows WHERE date = ? AND venue = ?",
+            (str(date_code), venue_code),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def entry(self, date_code, venue_code):
+        """Tier / fetch-time entry of a venue (None if never fetched)."""
+        return self.entries[str(date_code)].get(venue_code)
+
+    def restore(self, date_code, venue_code, shows_by_movie, entry):
+        """Put back an entry() and its shows lost before save() (journal replay)."""
+        self._store_shows(date_code, venue_code, shows_by_movie)
+        self.entries[str(date_code)][venue_code] = entry
+
+    def response_hash(self, date_code, venue_code):
+        """Content hash of the raw response `movies` was parsed from."""
+        entry = self.entries[str(date_code)].get(venue_code)
+        return entry.get("response_hash") if entry else None
+
+    def record(self, date_code, venue_code, shows_by_movie, now=None, response_hash=None):
+        """Remember a fresh fetch and re-tier the venue from how much it moved."""
+        now = time.time() if now is None else now
+        shows, gross, occupancy = venue_activity(shows_by_movie)
+        gross_rate = occupancy_rate = 0.0
+        empty_probes = 0
+        before = self.entries[str(date_code)].get(venue_code)
+        if not shows:
+            empty_probes = (before or {}).get("empty_probes", 0) + 1
+        if before is not None:
+            hours = max(now - before["fetched_at"], 60) / 3600
+            gross_rate = abs(gross - before["gross"]) / hours
+            occupancy_rate = abs(occupancy - before["occupancy"]) / hours
+
+        self._store_shows(date_code, venue_code, shows_by_movie)
+        self.entries[str(date_code)][venue_code] = {
+            "fetched_at": now,
+            "tier": assign_tier(shows, gross_rate, occupancy_rate),
+            "shows": shows,
+            "gross": gross,
+            "occupancy": occupancy,
+            "empty_probes": empty_probes,
+            "last_show_at": last_show_start(date_code, shows_by_movie),
+            "response_hash": response_hash,
+        }
+
+    def replace_shows(self, date_code, venue_code, shows_by_movie):
+        """Swap in shows re-parsed from an already recorded response
+        (--reparse). Fetch time, tier and probes stay those of the fetch,
+        so the venue is neither re-timed nor frozen by the reparse."""
+        self._store_shows(date_code, venue_code, shows_by_movie)
+        entry = self.entries[str(date_code)].get(venue_code)
+        if entry is not None:
+            entry["shows"], entry["gross"], entry["occupancy"] = venue_activity(shows_by_movie)
+            entry["last_show_at"] = last_show_start(date_code, shows_by_movie)
+
+    def _store_shows(self, date_code, venue_code, shows_by_movie):
+        self.db.execute(
+            "INSERT OR REPLACE INTO last_shows VALUES (?, ?, ?)",
+            (str(date_code), venue_code, pickle.dumps(shows_by_movie, pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def tier_counts(self, date_code):
+        counts = dict.fromkeys(TIERS, 0)
+        for entry in self.entries[str(date_code)].values():
+            counts[entry["tier"]] += 1
+        return counts
+
+    def save(self):
+        self.db.commit()
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)